@@ -0,0 +1,222 @@
+# Reproducible rendering and logic benchmarks for the Memory Match Game
+#
+# Drives MemoryGame headless under SDL's dummy video driver through scripted
+# scenarios and reports frames per second, frame-time percentiles and peak
+# resident memory for each, optionally comparing against a stored baseline.
+# Every scenario runs in a fresh process, so its memory figure includes the
+# SDL surfaces held by the render caches and is not inflated by earlier runs:
+#
+#     python benchmark.py --save-baseline benchmark_baseline.json
+#     python benchmark.py --baseline benchmark_baseline.json
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+import memory_match_game as mmg
+from stats import percentile
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory is then not reported
+    resource = None
+
+DEFAULT_SEED = 1234
+REGRESSION_TOLERANCE = 0.10  # Slowdown allowed before a scenario counts as regressed
+
+def start_game(game, difficulty, custom_grid=None):
+    game.difficulty = difficulty
+    game.custom_grid = custom_grid
+    game.state = mmg.GameState.PLAYING
+    game.setup_game()
+
+def perfect_play(every=10):
+    # Pick the next matching pair whenever the board is ready for input
+    def step(game, frame):
+        if frame % every or game.board.is_checking or game.state != mmg.GameState.PLAYING:
+            return
+        board = game.board
+        for first, card_type in enumerate(board.cards):
+            if board.matched[first] or board.face_up[first]:
+                continue
+            for second in range(first + 1, len(board.cards)):
+                if board.cards[second] == card_type and not board.matched[second]:
+                    game.select_card(first)
+                    game.select_card(second)
+                    return
+    return step
+
+# Scenarios: name -> (frames, setup). setup prepares the game and returns an
+# optional per-frame step function.
+def scenario_difficulty(difficulty):
+    def setup(game):
+        start_game(game, difficulty)
+        return perfect_play()
+    return setup
+
+def scenario_entrance(game):
+    # Only the staggered entrance animation, replayed every 150 frames
+    start_game(game, "Hard")
+    def step(game, frame):
+        if frame and frame % 150 == 0:
+            game.setup_game()
+    return step
+
+def scenario_particles(game):
+    # A match-sized particle burst from a random pair of cards every few frames
+    start_game(game, "Hard")
+    rng = random.Random(DEFAULT_SEED)
+    def step(game, frame):
+        if frame % 3 == 0:
+            for card in rng.sample(game.cards, 2):
+                game.particles.emit(card.x + mmg.CARD_WIDTH//2, card.y + mmg.CARD_HEIGHT//2, 20, mmg.YELLOW)
+    return step
+
+def scenario_transitions(game):
+    # Back-to-back fade out / fade in over a Hard board
+    start_game(game, "Hard")
+    def step(game, frame):
+        if not game.transition.is_active:
+            game.transition.start_fade_out()
+    return step
+
+def scenario_large_grid(game):
+    # A 6x300 board scrolled from top to bottom while pairs are matched
+    start_game(game, "Custom", (6, 300))
+    play = perfect_play(every=20)
+    def step(game, frame):
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=5, pos=(0, 0)))
+        play(game, frame)
+    return step
+
+SCENARIOS = {
+    "easy": (600, scenario_difficulty("Easy")),
+    "medium": (900, scenario_difficulty("Medium")),
+    "hard": (1200, scenario_difficulty("Hard")),
+    "entrance": (600, scenario_entrance),
+    "particles": (600, scenario_particles),
+    "transitions": (600, scenario_transitions),
+    "large-grid": (1200, scenario_large_grid),
+}
+
+def run_frames(frames, setup, seed):
+    # Play one scenario from a fixed seed, returning per-frame times in seconds
+    pygame.event.clear()
+    game = mmg.MemoryGame(seed=seed)
+    step = setup(game)
+    times = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        if step:
+            step(game, frame)
+        game.handle_events()
+        game.update()
+        game.draw()
+        mmg.dirty_rects.present()
+        times.append(time.perf_counter() - start)
+    return times
+
+def peak_rss_kb():
+    # The process's peak resident set size, or None where it cannot be read
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+def run_scenario(name, seed=DEFAULT_SEED):
+    # Runs in a worker process of its own; see main()
+    frames, setup = SCENARIOS[name]
+    mmg.init_display()
+    startup_rss = peak_rss_kb()
+    times = run_frames(frames, setup, seed)
+    peak_rss = peak_rss_kb()
+
+    ordered = sorted(times)
+    return {
+        "frames": frames,
+        "fps": frames / sum(times),
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        # Peak RSS of the whole process, and how far the scenario raised it past startup
+        "peak_rss_kb": peak_rss,
+        "scenario_rss_kb": peak_rss - startup_rss if peak_rss is not None else None,
+    }
+
+def format_memory(value):
+    return f"{value:10.0f}" if value is not None else f"{'-':>10}"
+
+def format_results(results):
+    lines = [f"{'scenario':<12} {'fps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'peak KiB':>10} {'+scen KiB':>10}"]
+    for name, result in results.items():
+        lines.append(
+            f"{name:<12} {result['fps']:9.1f} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+            f"{result['p99_ms']:8.2f} {result['max_ms']:8.2f} "
+            f"{format_memory(result['peak_rss_kb'])} {format_memory(result['scenario_rss_kb'])}"
+        )
+    return "\n".join(lines)
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    # Returns report lines and whether any scenario got slower than allowed
+    lines = [f"{'scenario':<12} {'p50':>8} {'p95':>8} {'fps':>8}  vs baseline"]
+    regressed = False
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f"{name:<12} (no baseline)")
+            continue
+        p50 = result["p50_ms"] / base["p50_ms"] - 1
+        p95 = result["p95_ms"] / base["p95_ms"] - 1
+        fps = result["fps"] / base["fps"] - 1
+        slower = p50 > tolerance or p95 > tolerance
+        regressed = regressed or slower
+        lines.append(f"{name:<12} {p50:+8.1%} {p95:+8.1%} {fps:+8.1%}  {'REGRESSED' if slower else 'ok'}")
+    return lines, regressed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory Match Game benchmarks")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO",
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--json", metavar="PATH", help="write the results to a JSON file")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a stored baseline")
+    parser.add_argument("--save-baseline", metavar="PATH", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="allowed slowdown before a scenario counts as regressed (default: 0.10)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    # A fresh spawned process per scenario, so peak RSS belongs to that scenario alone
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[name] = executor.submit(run_scenario, name, args.seed).result()
+    print(format_results(results))
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        lines, regressed = compare(results, baseline, args.tolerance)
+        print()
+        print("\n".join(lines))
+        return 1 if regressed else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# Headless board engine for the Memory Match Game
+#
+# Pure-Python game rules with no display dependency: deck generation, flips,
+# match checking, move and time accounting and the win condition. The pygame
+# front-end in memory_match_game.py is one client of it; bots, tests and
+# servers can drive it directly.
+import random
+import zlib
+
+# Grid sizes (columns, rows) for each difficulty
+DIFFICULTY_GRIDS = {
+    "Easy": (3, 2),  # 6 cards = 3 pairs
+    "Medium": (4, 3),  # 12 cards = 6 pairs
+    "Hard": (6, 3),  # 18 cards = 9 pairs (rearranged to fit better on screen)
+}
+
+def generate_deck(pairs, rng=random):
+    # Two cards of each type 1..pairs, shuffled
+    card_types = list(range(1, pairs + 1))
+    card_types = card_types + card_types  # Duplicate to create pairs
+    rng.shuffle(card_types)
+    return card_types
+
+class Board:
+    def __init__(self, columns, rows, rng=None):
+        self.columns = columns
+        self.rows = rows
+        self.pairs = (columns * rows) // 2
+        self.rng = rng if rng is not None else random.Random()
+        self.reset()
+
+    def reset(self):
+        # Deal a fresh shuffled deck and clear all counters
+        self.cards = generate_deck(self.pairs, self.rng)
+        self.face_up = [False] * len(self.cards)
+        self.matched = [False] * len(self.cards)
+        self.pending = []  # Indices of face-up cards waiting to be checked
+        self.moves = 0
+        self.matches = 0
+        self.elapsed_time = 0.0
+
+    @property
+    def is_checking(self):
+        return len(self.pending) == 2
+
+    @property
+    def is_won(self):
+        return self.matches == self.pairs
+
+    def can_flip(self, index):
+        return (
+            len(self.pending) < 2
+            and 0 <= index < len(self.cards)
+            and not self.face_up[index]
+            and not self.matched[index]
+        )
+
+    def flip(self, index):
+        # Turn a card face up; returns False if the flip is not allowed
+        if not self.can_flip(index):
+            return False
+        self.face_up[index] = True
+        self.pending.append(index)
+        if len(self.pending) == 2:
+            self.moves += 1
+        return True
+
+    def resolve(self):
+        # Check the pending pair; returns (first, second, matched) or None
+        if len(self.pending) != 2:
+            return None
+        first, second = self.pending
+        self.pending = []
+
+        if self.cards[first] == self.cards[second]:
+            self.matched[first] = True
+            self.matched[second] = True
+            self.matches += 1
+            return first, second, True
+
+        self.face_up[first] = False
+        self.face_up[second] = False
+        return first, second, False
+
+    def digest(self):
+        # Checksum of the full board state, for comparing recorded and replayed games
+        state = (self.cards, self.face_up, self.matched, self.pending, self.moves, self.matches, round(self.elapsed_time, 6))
+        return zlib.crc32(repr(state).encode())
+
+    def advance(self, dt):
+        # Accumulate play time until the board is cleared
+        if not self.is_won:
+            self.elapsed_time += dt
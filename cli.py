@@ -0,0 +1,29 @@
+# Shared command-line argument types for the Memory Match tools
+#
+# Used by the game, the solver and the load generator, so a grid size means
+# the same thing, and is rejected for the same reasons, everywhere.
+import argparse
+
+def parse_size(text, form="WxH"):
+    # Two integers joined by an "x", as in 800x600
+    try:
+        first, second = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected {form}, got {text!r}")
+    return first, second
+
+def parse_grid(text):
+    # Every card needs a partner, so a grid holds a positive, even number of cards
+    columns, rows = parse_size(text, "COLSxROWS")
+    if columns < 1 or rows < 1 or columns * rows % 2:
+        raise argparse.ArgumentTypeError(f"{text} needs a positive, even number of cards")
+    return columns, rows
+
+def positive_int(text):
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an integer, got {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return value
@@ -0,0 +1,127 @@
+# Load generator for the Memory Match server
+#
+# Opens many concurrent sessions against server.py, plays each one to the
+# end with the solver's limited-recall player and reports command round-trip
+# latency and throughput:
+#
+#     python server.py --check-delay 0.05 &
+#     python loadgen.py --sessions 2000 --games 5
+import argparse
+import asyncio
+import random
+import sys
+import time
+from server import DEFAULT_HOST, DEFAULT_PORT
+from cli import parse_grid
+from solver import Agent, DEFAULT_RECALL
+from stats import percentile
+
+# The client's view of a board, shaped like board.Board for the solver's agents
+class BoardView:
+    def __init__(self, card_count):
+        self.cards = [None] * card_count
+        self.matched = [False] * card_count
+
+class LoadStats:
+    def __init__(self):
+        self.latencies = []  # Seconds from sending a flip to its reply
+        self.games = 0
+        self.timer_pushes = 0
+        self.errors = 0
+
+async def read_reply(reader, stats):
+    # The next reply, skipping timer pushes
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        parts = line.decode().split()
+        if parts[0] != "T":
+            return parts
+        stats.timer_pushes += 1
+
+async def flip(reader, writer, index, stats):
+    start = time.perf_counter()
+    writer.write(f"F {index}\n".encode())
+    reply = await read_reply(reader, stats)
+    stats.latencies.append(time.perf_counter() - start)
+    if reply[0] != "U":
+        stats.errors += 1
+        return None
+    return int(reply[2])
+
+async def play_session(host, port, grid, games, recall, think, seed, stats):
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random(seed)
+    agent = Agent(rng, recall)
+    try:
+        for _ in range(games):
+            writer.write(f"N {grid[0]} {grid[1]} {rng.getrandbits(32)}\n".encode())
+            reply = await read_reply(reader, stats)
+            if reply[0] != "S":
+                stats.errors += 1
+                return
+            view = BoardView(grid[0] * grid[1])
+            agent.reset()
+            while True:
+                first = agent.first_pick(view)
+                view.cards[first] = await flip(reader, writer, first, stats)
+                agent.observe(first, view.cards[first])
+                if think:
+                    await asyncio.sleep(think)
+                second = agent.second_pick(view, first)
+                view.cards[second] = await flip(reader, writer, second, stats)
+                agent.observe(second, view.cards[second])
+                if view.cards[first] is None or view.cards[second] is None:
+                    return
+                reply = await read_reply(reader, stats)
+                if reply[0] == "M":
+                    view.matched[first] = view.matched[second] = True
+                    agent.forget(first)
+                    agent.forget(second)
+                    if all(view.matched):
+                        await read_reply(reader, stats)  # The win message
+                        stats.games += 1
+                        break
+        writer.write(b"Q\n")
+    finally:
+        writer.close()
+
+async def run(args):
+    stats = LoadStats()
+    start = time.perf_counter()
+    sessions = [
+        play_session(args.host, args.port, args.grid, args.games, args.recall, args.think, args.seed + i, stats)
+        for i in range(args.sessions)
+    ]
+    results = await asyncio.gather(*sessions, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    failed = [result for result in results if isinstance(result, Exception)]
+
+    ordered = sorted(stats.latencies)
+    print(f"{args.sessions} sessions, {stats.games} games in {elapsed:.1f} s "
+          f"({len(ordered) / elapsed:,.0f} flips/s, {stats.timer_pushes} timer pushes)")
+    if ordered:
+        print(f"flip round trip  p50 {percentile(ordered, 50) * 1000:.2f} ms  p95 {percentile(ordered, 95) * 1000:.2f} ms  "
+              f"p99 {percentile(ordered, 99) * 1000:.2f} ms  max {ordered[-1] * 1000:.2f} ms")
+    if stats.errors or failed:
+        print(f"{stats.errors} rejected commands, {len(failed)} failed sessions"
+              + (f" (first: {failed[0]!r})" if failed else ""))
+        return 1
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory Match server load generator")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--sessions", type=int, default=500, help="concurrent sessions (default: 500)")
+    parser.add_argument("--games", type=int, default=3, help="games played per session (default: 3)")
+    parser.add_argument("--grid", type=parse_grid, default=(4, 3), metavar="COLSxROWS", help="board size (default: 4x3)")
+    parser.add_argument("--recall", type=int, default=DEFAULT_RECALL, help="cards each simulated player remembers")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds each player waits between flips")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,63 @@
+import time
+STARTUP_BEGAN = time.perf_counter()  # Measured before the heavy imports for the startup report
+
 import pygame
-import sys
+import argparse
 import random
-import time
 import os
 import math
+import csv
+import json
+import sqlite3
+import struct
+import zlib
+import threading
+import numpy as np
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pygame import mixer
+from board import Board, DIFFICULTY_GRIDS
+from cli import parse_grid, parse_size
+from scores import ScoreStore, DEFAULT_PATH as DEFAULT_SCORES_PATH
+from stats import percentile
 
-# Initialize pygame
-pygame.init()
-mixer.init()
+# Startup-time report: where launch time goes, phase by phase
+class StartupTimer:
+    def __init__(self, began):
+        self.began = began
+        self.phases = []  # (name, seconds spent)
+        self.milestones = []  # (name, seconds since startup began)
+        
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+            
+    def mark(self, name):
+        self.milestones.append((name, time.perf_counter() - self.began))
+        
+    def report(self):
+        lines = ["Startup time:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<16} {seconds * 1000:8.1f} ms")
+        for name, seconds in self.milestones:
+            lines.append(f"  {name + ' at':<16} {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+startup_timer = StartupTimer(STARTUP_BEGAN)
 
-# Screen dimensions
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Memory Match Game")
+# Screen dimensions. The layout is designed for the base size and scaled to
+# the window by apply_layout()
+BASE_WIDTH = 800
+BASE_HEIGHT = 600
+SCREEN_WIDTH = BASE_WIDTH
+SCREEN_HEIGHT = BASE_HEIGHT
+UI_SCALE = 1.0  # Window size relative to the base layout
+screen = None  # Created by init_display()
 
 # Colors
 WHITE = (255, 255, 255)
@@ -29,7 +72,7 @@ RED = (255, 0, 0)
 GRAY = (200, 200, 200)
 DARK_GRAY = (50, 50, 50)
 
-# Game constants
+# Game constants (animation speeds and timers count fixed simulation steps)
 CARD_WIDTH = 80  # Reduced from 100
 CARD_HEIGHT = 120  # Reduced from 140
 CARD_MARGIN = 15  # Reduced from 20
@@ -41,16 +84,32 @@ TRANSITION_SPEED = 15
 FADE_SPEED = 10
 SCROLL_SPEED = 15  # Speed of scrolling
 
-# Scrolling variables
-scroll_y = 0
-max_scroll_y = 0  # Will be calculated based on card positions
+# Pixel sizes above at the base resolution, rescaled with the window
+BASE_CARD_WIDTH, BASE_CARD_HEIGHT, BASE_CARD_MARGIN = CARD_WIDTH, CARD_HEIGHT, CARD_MARGIN
+BASE_GRID_OFFSET_X, BASE_GRID_OFFSET_Y = GRID_OFFSET_X, GRID_OFFSET_Y
+BASE_SCROLL_SPEED = SCROLL_SPEED
+CARD_ART_SIZE = (CARD_WIDTH, CARD_HEIGHT)  # Size card art is drawn at before scaling
+CACHE_BUDGET_MAX_SCALE = 4  # Cap on how far the surface caches' byte budgets grow with the window (covers 4K)
+
+# Fixed-timestep simulation: logic always advances in SIM_RATE steps per second,
+# independent of how often frames are rendered
+SIM_RATE = 60
+SIM_DT = 1 / SIM_RATE
+MAX_SIM_STEPS = 8  # Steps per rendered frame before the backlog is dropped
+DEFAULT_FPS = 60
+
+# Large-board mode: only rows inside the viewport (plus a margin) are drawn and ticked
+CULL_MARGIN_ROWS = 1  # Covers the 100px drop of the entrance animation
+MAX_GRID_COLUMNS = (SCREEN_WIDTH - GRID_OFFSET_X - 15 + CARD_MARGIN) // (CARD_WIDTH + CARD_MARGIN)  # Leave room for the scrollbar
 
-# Create directories for assets if they don't exist
-os.makedirs("assets/images", exist_ok=True)
-os.makedirs("assets/sounds", exist_ok=True)
+def ui(value):
+    # A base-layout pixel distance at the current window scale
+    return round(value * UI_SCALE)
 
 # Create placeholder card images
 def create_card_images():
+    os.makedirs("assets/images", exist_ok=True)
+    
     # Create card back
     card_back = pygame.Surface((CARD_WIDTH, CARD_HEIGHT))
     card_back.fill(BLUE)
@@ -70,69 +129,833 @@ def create_card_images():
         (PINK, "☁"), (WHITE, "☮"), (GREEN, "☘"), (RED, "❤")
     ]
     
+    # Fonts are resolved once, not per symbol
+    font = assets.sized_font(60, bold=True)
+    small_font = assets.sized_font(20, bold=True)
+    
     for i, (color, symbol) in enumerate(symbols):
         card_front = pygame.Surface((CARD_WIDTH, CARD_HEIGHT))
         card_front.fill(WHITE)
         pygame.draw.rect(card_front, color, (5, 5, CARD_WIDTH-10, CARD_HEIGHT-10), 3)
         
         # Render symbol
-        font = pygame.font.SysFont("Arial", 60, bold=True)
         text = font.render(symbol, True, color)
         text_rect = text.get_rect(center=(CARD_WIDTH//2, CARD_HEIGHT//2))
         card_front.blit(text, text_rect)
         
         # Add small symbols in corners
-        small_font = pygame.font.SysFont("Arial", 20, bold=True)
         small_text = small_font.render(symbol, True, color)
         card_front.blit(small_text, (10, 10))
         card_front.blit(small_text, (CARD_WIDTH-25, CARD_HEIGHT-25))
         
         pygame.image.save(card_front, f"assets/images/card_{i+1}.png")
 
-# Create sound effects
-def create_sound_files():
-    # This is just a placeholder - in a real game, you'd include actual sound files
-    # For this example, we'll just create empty files to demonstrate the structure
-    placeholder_sounds = ["flip", "match", "nomatch", "win", "background"]
-    for sound in placeholder_sounds:
-        with open(f"assets/sounds/{sound}.txt", "w") as f:
-            f.write(f"Placeholder for {sound} sound effect")
-
-# Create assets if they don't exist
-if not os.path.exists("assets/images/card_back.png"):
-    create_card_images()
-    create_sound_files()
-
-# Load images
-card_back_img = pygame.image.load("assets/images/card_back.png")
-card_images = [pygame.image.load(f"assets/images/card_{i+1}.png") for i in range(16)]  # Increased from 8 to 16 for more card types
-
-# Load sounds (in a real game, you'd load actual sound files)
-try:
-    flip_sound = mixer.Sound("assets/sounds/flip.wav")
-    match_sound = mixer.Sound("assets/sounds/match.wav")
-    nomatch_sound = mixer.Sound("assets/sounds/nomatch.wav")
-    win_sound = mixer.Sound("assets/sounds/win.wav")
-    # Background music would be loaded and played here
-except:
-    # If sound files don't exist, create dummy sound objects
-    class DummySound:
-        def play(self): pass
-    flip_sound = DummySound()
-    match_sound = DummySound()
-    nomatch_sound = DummySound()
-    win_sound = DummySound()
-
-# Fonts
-title_font = pygame.font.SysFont("Arial", 48, bold=True)
-button_font = pygame.font.SysFont("Arial", 32, bold=True)
-info_font = pygame.font.SysFont("Arial", 24)
+# Font sizes per UI role
+FONT_SIZES = {
+    "title": (48, True),
+    "button": (32, True),
+    "info": (24, False),
+    "overlay": (14, False),
+}
+
+# Sound effects are synthesized into memory rather than read from disk.
+# Each effect is a run of (frequency Hz, seconds) tones in one category;
+# a category owns a fixed set of reserved mixer channels, so its voices
+# never compete with other effects for a free channel
+SOUND_RATE = 44100
+SOUND_BUFFER = 512  # Samples per mixer callback; bounds output latency
+SOUND_VOLUME = 0.35
+SOUND_CATEGORIES = {"flip": 4, "result": 2, "fanfare": 1}  # Category -> voice limit
+SOUND_EFFECTS = {
+    "flip": ("flip", ((660, 0.03), (990, 0.025))),
+    "match": ("result", ((660, 0.07), (880, 0.07), (1320, 0.12))),
+    "nomatch": ("result", ((330, 0.1), (247, 0.16))),
+    "win": ("fanfare", ((523, 0.12), (659, 0.12), (784, 0.12), (1047, 0.3))),
+}
+SOUND_NAMES = tuple(SOUND_EFFECTS)
+CARD_FACE_COUNT = 16
+
+# Card texture atlas: the back and every face packed into one sprite sheet,
+# cached on disk so startup opens a single file
+ATLAS_PATH = "assets/images/card_atlas.png"
+ATLAS_COLUMNS = 6
+
+def card_image_paths():
+    # Atlas cell 0 is the card back, cell i is face i
+    return ["assets/images/card_back.png"] + [f"assets/images/card_{i+1}.png" for i in range(CARD_FACE_COUNT)]
+
+class CardAtlas:
+    def __init__(self, sheet, cell_size):
+        self.sheet = sheet
+        self.cell_size = cell_size
+        self.cells = [sheet.subsurface(self.cell_rect(i)) for i in range(CARD_FACE_COUNT + 1)]
+        
+    def cell_rect(self, index):
+        row, col = divmod(index, ATLAS_COLUMNS)
+        width, height = self.cell_size
+        return pygame.Rect(col * width, row * height, width, height)
+        
+    @property
+    def back(self):
+        return self.cells[0]
+        
+    @property
+    def faces(self):
+        return self.cells[1:]
+        
+    @classmethod
+    def is_stale(cls, path=ATLAS_PATH):
+        if not os.path.exists(path):
+            return True
+        atlas_time = os.path.getmtime(path)
+        return any(os.path.getmtime(source) > atlas_time for source in card_image_paths())
+        
+    @classmethod
+    def build(cls, path=ATLAS_PATH):
+        # Pack the individual card images into a sheet and save it for next launch
+        images = [pygame.image.load(source) for source in card_image_paths()]
+        cell_size = images[0].get_size()
+        rows = math.ceil(len(images) / ATLAS_COLUMNS)
+        sheet = pygame.Surface((cell_size[0] * ATLAS_COLUMNS, cell_size[1] * rows))
+        atlas = cls(sheet, cell_size)
+        for index, image in enumerate(images):
+            sheet.blit(image, atlas.cell_rect(index))
+        # The saved sheet is only a cache; a read-only install keeps it in memory
+        try:
+            pygame.image.save(sheet, path)
+        except (pygame.error, OSError):
+            pass
+        return atlas
+        
+    @classmethod
+    def read(cls, path=ATLAS_PATH):
+        # Disk work only, safe on a worker thread
+        if cls.is_stale(path):
+            return cls.build(path)
+        sheet = pygame.image.load(path)
+        rows = math.ceil((CARD_FACE_COUNT + 1) / ATLAS_COLUMNS)
+        return cls(sheet, (sheet.get_width() // ATLAS_COLUMNS, sheet.get_height() // rows))
+        
+    def converted(self):
+        # Match the display's pixel format once so blits skip per-frame conversion;
+        # needs the display, so this runs on the main thread
+        if pygame.display.get_surface() is None:
+            return self
+        return CardAtlas(self.sheet.convert(), self.cell_size)
+        
+    @classmethod
+    def load(cls, path=ATLAS_PATH):
+        return cls.read(path).converted()
+
+# Lazily loaded assets: nothing is initialized or read from disk until first use
+class AssetLibrary:
+    def __init__(self):
+        self.atlas = None
+        self.card_back_img = None  # Atlas cells scaled to the current card size
+        self.card_images = None
+        self.scaled_size = None
+        self.font_paths = {}  # bold -> font file, resolved once
+        self.fonts = {}  # (size, bold) -> Font
+        self.read_atlas = None  # Read by a loader thread, awaiting conversion
+        
+    def read_images(self):
+        with startup_timer.phase("images"):
+            # Create assets if they don't exist
+            if not os.path.exists("assets/images/card_back.png"):
+                create_card_images()
+            self.read_atlas = CardAtlas.read()
+            
+    def finish_images(self):
+        self.atlas = self.read_atlas.converted()
+        self.read_atlas = None
+        self.card_back_img = self.atlas.back
+        self.card_images = self.atlas.faces
+        self.scaled_size = self.atlas.cell_size
+        
+    def load_images(self):
+        if self.card_images is None:
+            if self.read_atlas is None:
+                self.read_images()
+            self.finish_images()
+        # Re-rasterize the cells once each time the card size changes, never per frame
+        if self.scaled_size != (CARD_WIDTH, CARD_HEIGHT):
+            self.scaled_size = (CARD_WIDTH, CARD_HEIGHT)
+            cells = self.atlas.cells
+            if self.scaled_size != self.atlas.cell_size:
+                cells = [pygame.transform.smoothscale(cell, self.scaled_size) for cell in cells]
+                profiler.add("surface_allocs", len(cells))
+            self.card_back_img = cells[0]
+            self.card_images = cells[1:]
+            
+    def card_back(self):
+        self.load_images()
+        return self.card_back_img
+        
+    def card_face(self, card_type):
+        self.load_images()
+        return self.card_images[card_type - 1]
+        
+    def sized_font(self, size, bold=False):
+        font = self.fonts.get((size, bold))
+        if font is None:
+            self.resolve_font(bold)
+            font = pygame.font.Font(self.font_paths[bold], size)
+            if self.font_paths[bold] is None:
+                font.set_bold(bold)  # Default font stands in for Arial
+            self.fonts[(size, bold)] = font
+        return font
+        
+    def resolve_font(self, bold):
+        # The system font lookup is slow, so it happens once per weight
+        if bold not in self.font_paths:
+            with startup_timer.phase("fonts"):
+                self.font_paths[bold] = pygame.font.match_font("Arial", bold=bold)
+                
+    def font(self, role):
+        size, bold = FONT_SIZES[role]
+        return self.sized_font(max(1, ui(size)), bold)
+        
+    def prune_fonts(self):
+        # Keep only the role fonts for the current window size, so resizing
+        # does not pile up fonts for every size the window passed through
+        current = {(max(1, ui(size)), bold) for size, bold in FONT_SIZES.values()}
+        self.fonts = {key: font for key, font in self.fonts.items() if key in current}
+        
+assets = AssetLibrary()
+
+# Sample types for the mixer formats pygame can report
+SAMPLE_TYPES = {8: np.uint8, -8: np.int8, 16: np.uint16, -16: np.int16, -32: np.int32, 32: np.float32}
+
+class SoundBank:
+    def __init__(self):
+        self.sounds = {}
+        self.channels = {}  # Category -> reserved channels
+        self.started = {}  # Channel -> time its current voice began
+        self.ready = None  # Unknown until the first sound is requested
+        self.lock = threading.Lock()
+        self.plays = 0
+        self.steals = 0
+        self.dispatch_time = 0.0
+        
+    def init(self):
+        # The mixer is only started once a sound is actually needed
+        with self.lock:
+            if self.ready is not None:
+                return self.ready
+            with startup_timer.phase("mixer"):
+                try:
+                    mixer.pre_init(SOUND_RATE, -16, 2, SOUND_BUFFER)
+                    mixer.init()
+                except pygame.error:
+                    self.ready = False
+                    return False
+                # Reserve a block of channels per category so ad-hoc playback never takes them
+                mixer.set_num_channels(max(mixer.get_num_channels(), sum(SOUND_CATEGORIES.values())))
+                mixer.set_reserved(sum(SOUND_CATEGORIES.values()))
+                first = 0
+                for category, voices in SOUND_CATEGORIES.items():
+                    self.channels[category] = [mixer.Channel(first + i) for i in range(voices)]
+                    first += voices
+                self.ready = True
+            return True
+            
+    def synthesize(self, tones):
+        # Sine tones with a short linear fade at each end to avoid clicks
+        frequency, size, channels = mixer.get_init()
+        parts = []
+        for pitch, seconds in tones:
+            t = np.arange(int(frequency * seconds)) / frequency
+            envelope = np.minimum(1.0, np.minimum(t, seconds - t) / 0.005)
+            parts.append(np.sin(2 * math.pi * pitch * t) * envelope)
+        wave = np.concatenate(parts) * SOUND_VOLUME
+        sample_type = SAMPLE_TYPES[size]
+        if sample_type is not np.float32:
+            info = np.iinfo(sample_type)
+            wave = wave * info.max if info.min < 0 else (wave + 1) / 2 * info.max
+        samples = wave.astype(sample_type)
+        if channels > 1:
+            samples = np.repeat(samples[:, None], channels, axis=1)
+        return pygame.sndarray.make_sound(np.ascontiguousarray(samples))
+        
+    def sound(self, name):
+        sound = self.sounds.get(name)
+        if sound is None and self.init():
+            sound = self.synthesize(SOUND_EFFECTS[name][1])
+            self.sounds[name] = sound
+        return sound
+        
+    def play(self, name):
+        sound = self.sound(name)
+        if sound is None:
+            return
+        start = time.perf_counter()
+        # Use an idle voice of the effect's category, else cut off its oldest voice
+        channels = self.channels[SOUND_EFFECTS[name][0]]
+        channel = next((channel for channel in channels if not channel.get_busy()), None)
+        if channel is None:
+            channel = min(channels, key=lambda channel: self.started.get(channel, 0))
+            self.steals += 1
+        channel.play(sound)
+        self.started[channel] = start
+        self.plays += 1
+        self.dispatch_time += time.perf_counter() - start
+        
+    @property
+    def latency_ms(self):
+        # Delay from play() to the speakers is dominated by one mixer buffer
+        if not self.ready:
+            return None
+        return SOUND_BUFFER / mixer.get_init()[0] * 1000
+        
+    def report(self):
+        if not self.ready or mixer.get_init() is None:
+            return "Audio: mixer unavailable"
+        frequency, size, channels = mixer.get_init()
+        lines = [
+            "Audio:",
+            f"  format           {frequency} Hz, {abs(size)}-bit, {channels} channel(s)",
+            f"  output latency   {self.latency_ms:8.1f} ms ({SOUND_BUFFER} sample buffer)",
+            "  voices           " + ", ".join(f"{category} {voices}" for category, voices in SOUND_CATEGORIES.items()),
+            f"  plays            {self.plays:8d} ({self.steals} voices stolen)",
+        ]
+        if self.plays:
+            lines.append(f"  dispatch         {self.dispatch_time / self.plays * 1e6:8.1f} us per play")
+        return "\n".join(lines)
+
+sound_bank = SoundBank()
+
+# Background asset loading: disk and decode work runs on worker threads while
+# the main thread keeps the window responsive and draws a loading screen
+class AssetLoader:
+    def __init__(self, library, workers=2):
+        self.library = library
+        self.tasks = [lambda: library.resolve_font(True), lambda: library.resolve_font(False), library.read_images]
+        self.tasks += [lambda name=name: sound_bank.sound(name) for name in SOUND_NAMES]
+        self.futures = []
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        
+    def start(self):
+        for task in self.tasks:
+            self.futures.append(self.executor.submit(task))
+            
+    @property
+    def progress(self):
+        return sum(future.done() for future in self.futures) / len(self.tasks)
+        
+    @property
+    def is_done(self):
+        return all(future.done() for future in self.futures)
+        
+    def finish(self):
+        # Main thread: surface worker errors and convert surfaces for the display
+        for future in self.futures:
+            future.result()
+        self.executor.shutdown(wait=False)
+        self.library.finish_images()
+
+def play_sound(name):
+    sound_bank.play(name)
+
+def init_display(size=(BASE_WIDTH, BASE_HEIGHT), fullscreen=False):
+    # Initialize only the pygame subsystems the game needs
+    with startup_timer.phase("display"):
+        pygame.display.init()
+        pygame.font.init()
+        set_display_mode(size, fullscreen)
+        apply_layout(*screen.get_size())
+        pygame.display.set_caption("Memory Match Game")
+        configure_event_queue()
+    return screen
+
+windowed_size = (BASE_WIDTH, BASE_HEIGHT)  # Restored when leaving fullscreen
+
+def set_display_mode(size, fullscreen=False):
+    global screen, windowed_size
+    if fullscreen:
+        screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)  # Desktop resolution
+    else:
+        windowed_size = size
+        screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+        
+def toggle_fullscreen():
+    # Switch modes, then announce the new size like a window resize so the game
+    # relayouts through the same recordable event as a resize
+    set_display_mode(windowed_size, not screen.get_flags() & pygame.FULLSCREEN)
+    width, height = screen.get_size()
+    pygame.event.post(pygame.event.Event(pygame.VIDEORESIZE, w=width, h=height, size=(width, height)))
+    
+def apply_layout(width, height):
+    # Scale the base layout to a window size and drop everything rasterized for
+    # the old one; returns False if the size did not change
+    global SCREEN_WIDTH, SCREEN_HEIGHT, UI_SCALE, MAX_GRID_COLUMNS
+    global CARD_WIDTH, CARD_HEIGHT, CARD_MARGIN, GRID_OFFSET_X, GRID_OFFSET_Y, SCROLL_SPEED
+    if (width, height) == (SCREEN_WIDTH, SCREEN_HEIGHT):
+        return False
+    SCREEN_WIDTH, SCREEN_HEIGHT = width, height
+    UI_SCALE = min(width / BASE_WIDTH, height / BASE_HEIGHT)
+    CARD_WIDTH = max(1, ui(BASE_CARD_WIDTH))
+    CARD_HEIGHT = max(1, ui(BASE_CARD_HEIGHT))
+    CARD_MARGIN = max(1, ui(BASE_CARD_MARGIN))
+    GRID_OFFSET_X = max(1, ui(BASE_GRID_OFFSET_X))
+    GRID_OFFSET_Y = max(1, ui(BASE_GRID_OFFSET_Y))
+    SCROLL_SPEED = max(1, ui(BASE_SCROLL_SPEED))
+    MAX_GRID_COLUMNS = max(1, (SCREEN_WIDTH - GRID_OFFSET_X - ui(15) + CARD_MARGIN) // (CARD_WIDTH + CARD_MARGIN))
+    
+    # Surface caches grow with the surfaces they hold, up to a fixed cap, so a
+    # large window caches fewer of them rather than using unbounded memory
+    area = min(CACHE_BUDGET_MAX_SCALE, max(1.0, UI_SCALE ** 2))
+    deck.budget = FACE_CACHE_BUDGET * area
+    entrance_cache.budget = ENTRANCE_CACHE_BUDGET * area
+    assets.prune_fonts()
+    deck.clear()
+    entrance_cache.clear()
+    flip_cache.frames = {}
+    overlay_pool.clear()
+    text_cache.surfaces.clear()
+    dirty_rects.add_full()
+    return True
+
+# Procedural card faces: types past the drawn set are generated on demand
+# from a (shape, color, pattern) combination, with a row of tier dots once
+# those run out, and kept in an LRU bounded by a memory budget
+FACE_SHAPES = ("circle", "square", "triangle", "diamond", "ring", "cross", "star", "hexagon")
+FACE_COLORS = (RED, GREEN, BLUE, PURPLE, (255, 140, 0), (0, 160, 160), (139, 69, 19), (255, 20, 147))
+FACE_PATTERNS = ("plain", "stripes", "dots", "checks", "frame", "diagonal")
+FACE_CACHE_BUDGET = 16 * 1024 * 1024  # bytes
+FACE_PREFETCH_ROWS = 3  # Rows beyond the viewport generated ahead of need
+
+def face_shape_points(shape, center, radius):
+    # Polygon outline for the polygonal shapes
+    x, y = center
+    if shape == "square":
+        side = radius * 0.85
+        return [(x - side, y - side), (x + side, y - side), (x + side, y + side), (x - side, y + side)]
+    if shape == "cross":
+        arm = radius * 0.35
+        return [(x - arm, y - radius), (x + arm, y - radius), (x + arm, y - arm), (x + radius, y - arm),
+                (x + radius, y + arm), (x + arm, y + arm), (x + arm, y + radius), (x - arm, y + radius),
+                (x - arm, y + arm), (x - radius, y + arm), (x - radius, y - arm), (x - arm, y - arm)]
+    corners, start, inner = {"triangle": (3, -90, None), "diamond": (4, -90, None), "hexagon": (6, 0, None), "star": (5, -90, 0.45)}[shape]
+    points = []
+    for i in range(corners * (2 if inner else 1)):
+        angle = math.radians(start + i * 360 / (corners * (2 if inner else 1)))
+        r = radius * inner if inner and i % 2 else radius
+        points.append((x + r * math.cos(angle), y + r * math.sin(angle)))
+    return points
+
+def draw_face_shape(surface, shape, color, center, radius):
+    if shape == "circle":
+        pygame.draw.circle(surface, color, center, radius)
+    elif shape == "ring":
+        pygame.draw.circle(surface, color, center, radius, max(2, radius // 4))
+    else:
+        pygame.draw.polygon(surface, color, face_shape_points(shape, center, radius))
+
+class DeckProvider:
+    def __init__(self, budget=FACE_CACHE_BUDGET):
+        self.budget = budget
+        self.used = 0
+        self.faces = OrderedDict()  # card type -> surface, least recently used first
+        self.queued = set()  # Types waiting on the background generator
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="faces")
+        
+    @staticmethod
+    def combination(card_type):
+        # Mixed-radix split of the generated type index into its features
+        index = card_type - CARD_FACE_COUNT - 1
+        index, shape = divmod(index, len(FACE_SHAPES))
+        index, color = divmod(index, len(FACE_COLORS))
+        tier, pattern = divmod(index, len(FACE_PATTERNS))
+        return FACE_SHAPES[shape], FACE_COLORS[color], FACE_PATTERNS[pattern], tier
+        
+    def render(self, card_type):
+        shape, color, pattern, tier = self.combination(card_type)
+        # Drawn at the art size in the display's format, so blits need no
+        # conversion; safe off the main thread
+        width, height = CARD_ART_SIZE
+        face = pygame.Surface(CARD_ART_SIZE, 0, screen) if screen is not None else pygame.Surface(CARD_ART_SIZE)
+        profiler.add("surface_allocs")
+        face.fill(WHITE)
+        tint = tuple((channel + 3 * 255) // 4 for channel in color)
+        if pattern == "stripes":
+            for y in range(8, height - 8, 8):
+                pygame.draw.line(face, tint, (8, y), (width - 9, y), 3)
+        elif pattern == "dots":
+            for y in range(14, height - 8, 12):
+                for x in range(14, width - 8, 12):
+                    pygame.draw.circle(face, tint, (x, y), 3)
+        elif pattern == "checks":
+            for y in range(8, height - 8, 10):
+                for x in range(8 + (y // 10 % 2) * 10, width - 8, 20):
+                    pygame.draw.rect(face, tint, (x, y, 10, 10))
+        elif pattern == "frame":
+            pygame.draw.rect(face, tint, (12, 12, width - 24, height - 24), 4)
+        elif pattern == "diagonal":
+            for x in range(-height, width, 12):
+                pygame.draw.line(face, tint, (x, height - 8), (x + height - 16, 8), 3)
+        pygame.draw.rect(face, color, (5, 5, width-10, height-10), 3)
+        
+        # Large symbol in the middle, small ones in the corners as on the drawn faces
+        draw_face_shape(face, shape, color, (width//2, height//2), 24)
+        draw_face_shape(face, shape, color, (17, 17), 7)
+        draw_face_shape(face, shape, color, (width - 17, height - 17), 7)
+        
+        # Tier in binary, filled dots for set bits, along the bottom edge
+        for bit in range(tier.bit_length()):
+            row, col = divmod(bit, 5)
+            center = (width//2 - 16 + col * 8, height - 30 - row * 8)
+            pygame.draw.circle(face, BLACK, center, 3, 0 if tier >> bit & 1 else 1)
+        if (CARD_WIDTH, CARD_HEIGHT) != CARD_ART_SIZE:
+            face = pygame.transform.smoothscale(face, (CARD_WIDTH, CARD_HEIGHT))
+        return face
+        
+    def face(self, card_type):
+        # The drawn faces live in the atlas; everything past them is generated
+        if card_type <= CARD_FACE_COUNT:
+            return assets.card_face(card_type)
+        with self.lock:
+            face = self.faces.get(card_type)
+            if face is not None:
+                self.faces.move_to_end(card_type)
+                return face
+        # A miss the prefetcher did not cover is rendered in place
+        return self.store(card_type, self.render(card_type))
+        
+    def store(self, card_type, face):
+        with self.lock:
+            self.queued.discard(card_type)
+            if face.get_size() != (CARD_WIDTH, CARD_HEIGHT):
+                return face  # Rendered before a resize; not worth keeping
+            if card_type in self.faces:
+                return self.faces[card_type]
+            self.faces[card_type] = face
+            self.used += face.get_width() * face.get_height() * face.get_bytesize()
+            while self.used > self.budget and len(self.faces) > 1:
+                _, evicted = self.faces.popitem(last=False)
+                self.used -= evicted.get_width() * evicted.get_height() * evicted.get_bytesize()
+        return face
+        
+    def clear(self):
+        with self.lock:
+            self.faces.clear()
+            self.used = 0
+            
+    def prefetch(self, card_types):
+        # Generate faces that will be needed soon on the background thread
+        with self.lock:
+            missing = [t for t in dict.fromkeys(card_types) if t > CARD_FACE_COUNT and t not in self.faces and t not in self.queued]
+            self.queued.update(missing)
+        for card_type in missing:
+            self.executor.submit(lambda card_type=card_type: self.store(card_type, self.render(card_type)))
+
+deck = DeckProvider()
+
+# Flip-frame cache: pre-scaled card surfaces for the flip animation
+FLIP_WIDTH_STEP = 4  # Quantize flip widths so nearby frames share a surface
+MIN_FLIP_WIDTH = 5  # Minimum width during flip
+
+class FlipFrameCache:
+    def __init__(self):
+        self.frames = {}  # (card_type, showing_face, width) -> surface
+        
+    def quantize(self, width):
+        width = (width + FLIP_WIDTH_STEP // 2) // FLIP_WIDTH_STEP * FLIP_WIDTH_STEP
+        return max(MIN_FLIP_WIDTH, min(CARD_WIDTH, width))
+        
+    def build(self, card_types):
+        # Pre-render every flip width for the back and each drawn face in the deck
+        self.frames = {}
+        widths = sorted({self.quantize(w) for w in range(0, CARD_WIDTH + 1)})
+        for width in widths:
+            self.frames[(0, False, width)] = pygame.transform.scale(assets.card_back(), (width, CARD_HEIGHT))
+            for card_type in set(card_types):
+                if card_type <= CARD_FACE_COUNT:
+                    self.frames[(card_type, True, width)] = pygame.transform.scale(assets.card_face(card_type), (width, CARD_HEIGHT))
+                    
+    def get(self, card_type, showing_face, width):
+        width = self.quantize(width)
+        key = (card_type if showing_face else 0, showing_face, width)
+        frame = self.frames.get(key)
+        if frame is None:
+            # Generated faces are scaled per frame rather than kept, so a large
+            # deck's flip frames cannot outgrow the face cache's budget
+            image = deck.face(card_type) if showing_face else assets.card_back()
+            frame = pygame.transform.scale(image, (width, CARD_HEIGHT))
+            profiler.add("surface_allocs")
+            if not showing_face or card_type <= CARD_FACE_COUNT:
+                self.frames[key] = frame
+        return frame
+
+flip_cache = FlipFrameCache()
+
+# Entrance-animation sprite cache: rotozoomed card surfaces keyed by quantized
+# (rotation, scale), shared by every card and bounded by a memory budget
+ENTRANCE_ROTATION_STEP = 2  # degrees
+ENTRANCE_SCALE_STEP = 0.025
+ENTRANCE_CACHE_BUDGET = 32 * 1024 * 1024  # bytes
+
+class EntranceSpriteCache:
+    def __init__(self, budget=ENTRANCE_CACHE_BUDGET):
+        self.budget = budget
+        self.used = 0
+        self.sprites = OrderedDict()  # (image key, rotation, scale) -> surface
+        
+    def get(self, image_key, image, rotation, scale):
+        # image_key identifies the source image: 0 for the back, else the card type
+        rotation = round(rotation / ENTRANCE_ROTATION_STEP) * ENTRANCE_ROTATION_STEP
+        scale = max(ENTRANCE_SCALE_STEP, round(scale / ENTRANCE_SCALE_STEP) * ENTRANCE_SCALE_STEP)
+        key = (image_key, rotation, scale)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+            
+        sprite = pygame.transform.rotozoom(image, rotation, scale)
+        profiler.add("surface_allocs")
+        self.sprites[key] = sprite
+        self.used += self.sprite_bytes(sprite)
+        while self.used > self.budget and len(self.sprites) > 1:
+            _, evicted = self.sprites.popitem(last=False)
+            self.used -= self.sprite_bytes(evicted)
+        return sprite
+        
+    @staticmethod
+    def sprite_bytes(sprite):
+        return sprite.get_width() * sprite.get_height() * sprite.get_bytesize()
+        
+    def clear(self):
+        self.sprites.clear()
+        self.used = 0
+
+entrance_cache = EntranceSpriteCache()
+
+# Dirty-rectangle tracking for the opt-in partial display update mode
+class DirtyRects:
+    def __init__(self):
+        self.enabled = False
+        self.rects = []
+        self.previous_rects = []
+        self.full = True
+        self.previous_full = True
+        
+    def add(self, rect):
+        if self.enabled and rect:
+            self.rects.append(pygame.Rect(rect))
+            
+    def add_full(self):
+        self.full = True
+        
+    def present(self):
+        if not self.enabled or self.full or self.previous_full:
+            pygame.display.flip()
+        else:
+            # Push this frame's regions plus last frame's so vacated areas get erased
+            pygame.display.update(self.rects + self.previous_rects)
+        self.previous_rects = self.rects
+        self.previous_full = self.full
+        self.rects = []
+        self.full = False
+
+dirty_rects = DirtyRects()
+
+# Frame-phase profiler: per-phase timers with rolling percentiles, per-frame
+# counters and CSV/JSON export. Costs nothing until enabled.
+PROFILE_WINDOW = 300  # Frames kept for the rolling percentiles
+PROFILE_HISTORY = 36000  # Frames kept for export (10 minutes at 60 fps)
+# Counters are bumped at the game's own draw sites: draw_calls counts blits
+# and primitives drawn to the screen, surface_allocs surfaces created by the
+# render caches and layers after startup
+PROFILE_COUNTERS = ("draw_calls", "surface_allocs")
+OVERLAY_REFRESH = 15  # Frames between overlay text updates
+
+class FrameProfiler:
+    def __init__(self, window=PROFILE_WINDOW, history=PROFILE_HISTORY):
+        self.enabled = False
+        self.show_overlay = False
+        self.window = window
+        self.samples = {}  # name -> recent per-frame values
+        self.history = deque(maxlen=history)  # per-frame rows for export
+        self.frame = dict.fromkeys(PROFILE_COUNTERS, 0)
+        self.frame_count = 0
+        self.lap_start = 0
+        self.overlay_labels = []
+        self.overlay_lines = []
+        
+    def enable(self):
+        self.enabled = True
+        
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+            
+    def lap(self, name=None):
+        # Attribute the time since the previous lap to a sub-phase
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if name is not None:
+            self.add(name, (now - self.lap_start) * 1000)
+        self.lap_start = now
+        
+    def add(self, name, value=1):
+        if self.enabled:
+            self.frame[name] = self.frame.get(name, 0) + value
+            
+    def end_frame(self):
+        if not self.enabled:
+            return
+        for name, value in self.frame.items():
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(value)
+        self.frame["frame_index"] = self.frame_count
+        self.history.append(self.frame)
+        self.frame = dict.fromkeys(PROFILE_COUNTERS, 0)
+        self.frame_count += 1
+        
+    def percentiles(self, name, points=(50, 95, 99)):
+        values = sorted(self.samples.get(name, ()))
+        if not values:
+            return None
+        return [percentile(values, point) for point in points]
+        
+    def summary(self):
+        return {name: dict(zip(("p50", "p95", "p99"), self.percentiles(name))) for name in self.samples}
+        
+    def export(self, path):
+        rows = list(self.history)
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"summary": self.summary(), "frames": rows}, f, indent=1)
+            return
+        columns = ["frame_index"] + sorted({name for row in rows for name in row} - {"frame_index"})
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, restval=0)
+            writer.writeheader()
+            writer.writerows(rows)
+            
+    def draw_overlay(self, surface):
+        if not self.show_overlay:
+            return
+        names = ["frame", "events", "update", "draw"] + sorted(name for name in self.samples if name.startswith("draw."))
+        if self.frame_count % OVERLAY_REFRESH == 0 or not self.overlay_labels:
+            lines = ["phase ms       p50    p95    p99"]
+            for name in names:
+                values = self.percentiles(name)
+                if values:
+                    lines.append(f"{name:<15}" + "".join(f"{value:7.2f}" for value in values))
+            for name in PROFILE_COUNTERS:
+                values = self.percentiles(name)
+                if values:
+                    lines.append(f"{name:<15}" + "".join(f"{value:7.0f}" for value in values))
+            while len(self.overlay_labels) < len(lines):
+                self.overlay_labels.append(HudLabel("overlay", YELLOW))
+            self.overlay_lines = lines
+            
+        panel = overlay_surface((330, len(self.overlay_lines) * 16 + 10), BLACK, 190)
+        top = SCREEN_HEIGHT - panel.get_height() - 10
+        self.add("draw_calls", 1 + len(self.overlay_lines))
+        dirty_rects.add(surface.blit(panel, (10, top)))
+        for i, line in enumerate(self.overlay_lines):
+            surface.blit(self.overlay_labels[i].render(line), (15, top + 5 + i * 16))
+
+profiler = FrameProfiler()
+
+# Text surface cache with LRU eviction, keyed by (font, text, color)
+TEXT_CACHE_SIZE = 256
+
+class TextCache:
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            profiler.add("surface_allocs")
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+text_cache = TextCache()
+
+def render_text(font, text, color):
+    return text_cache.render(font, text, color)
+
+# HUD label that re-renders only when its text changes
+class HudLabel:
+    def __init__(self, font_role, color=WHITE):
+        self.font_role = font_role  # Resolved on first render, after assets have loaded
+        self.color = color
+        self.font = None
+        self.text = None
+        self.surface = None
+        
+    def render(self, text):
+        # The font changes with the window size
+        font = assets.font(self.font_role)
+        if text != self.text or font is not self.font:
+            self.surface = font.render(text, True, self.color)
+            profiler.add("surface_allocs")
+            self.font = font
+            self.text = text
+        return self.surface
+
+# Pooled translucent overlays: one solid surface per (size, color), shared by
+# every caller and faded with set_alpha, so no overlay is allocated per frame
+overlay_pool = {}
+
+def overlay_surface(size, color, alpha):
+    surface = overlay_pool.get((size, color))
+    if surface is None:
+        surface = pygame.Surface(size)
+        profiler.add("surface_allocs")
+        surface.fill(color)
+        overlay_pool[(size, color)] = surface
+    surface.set_alpha(alpha)
+    return surface
+
+# Layer compositor: caches each screen's static layer so a frame is one blit
+class LayerCompositor:
+    def __init__(self):
+        self.layers = {}  # (name, resolution) -> (signature, surface)
+        
+    def get(self, name, build, signature=None):
+        # Rebuild only when the resolution or the layer's signature changes
+        key = (name, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        cached = self.layers.get(key)
+        if cached is None or cached[0] != signature:
+            cached = (signature, build().convert())
+            profiler.add("surface_allocs", 2)
+            self.layers[key] = cached
+        return cached[1]
+        
+    def invalidate(self, name=None):
+        if name is None:
+            self.layers.clear()
+        else:
+            self.layers = {key: value for key, value in self.layers.items() if key[0] != name}
 
 # Game states
 class GameState:
     MENU = 0
     PLAYING = 1
     GAME_OVER = 2
+    LOADING = 3
 
 # Transition class for smooth screen transitions
 class Transition:
@@ -185,124 +1008,245 @@ class Transition:
         
     def draw(self, screen):
         if self.is_active:
-            fade_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            fade_surface.fill((0, 0, 0, self.alpha))
-            screen.blit(fade_surface, (0, 0))
+            dirty_rects.add_full()
+            profiler.add("draw_calls")
+            screen.blit(overlay_surface(screen.get_size(), BLACK, self.alpha), (0, 0))
 
-# Card class
+# Card state for a whole board, stored as NumPy arrays indexed by card so
+# entrance and flip animations advance in one vectorized step per frame
+class CardStore:
+    def __init__(self, card_types=()):
+        count = len(card_types)
+        self.card_type = np.array(card_types, dtype=np.int32)
+        self.x = np.zeros(count, dtype=np.int32)  # Grid slot
+        self.original_y = np.zeros(count, dtype=np.int32)
+        self.y = np.zeros(count)  # Drawn position, eased toward the slot on entrance
+        self.scale = np.ones(count)
+        self.rotation = np.zeros(count)
+        self.flip_progress = np.zeros(count, dtype=np.int32)  # 0: showing back, 100: showing front
+        self.entrance_delay = np.zeros(count, dtype=np.int32)  # frames
+        self.is_flipped = np.zeros(count, dtype=bool)
+        self.is_matched = np.zeros(count, dtype=bool)
+        self.is_flipping = np.zeros(count, dtype=bool)
+        self.has_entered = np.zeros(count, dtype=bool)
+        self.turning = set()  # Cards with a flip in progress, ticked even when culled
+        
+        # The last simulation step, so drawing can interpolate
+        self.prev_y = np.zeros(count)
+        self.prev_scale = np.ones(count)
+        self.prev_rotation = np.zeros(count)
+        self.prev_flip_progress = np.zeros(count, dtype=np.int32)
+        
+    def __len__(self):
+        return len(self.card_type)
+        
+    def place(self, columns):
+        # Move every card to its grid slot, carrying any entrance animation along
+        index = np.arange(len(self))
+        offset_y = self.y - self.original_y
+        self.x[:] = GRID_OFFSET_X + index % columns * (CARD_WIDTH + CARD_MARGIN)
+        self.original_y[:] = GRID_OFFSET_Y + index // columns * (CARD_HEIGHT + CARD_MARGIN)
+        self.y[:] = self.prev_y[:] = self.original_y + offset_y
+        
+    def start_entrance(self, delays, rotations):
+        self.entrance_delay[:] = delays
+        self.scale[:] = 0.1
+        self.rotation[:] = rotations
+        self.y[:] = self.original_y - ui(100)
+        self.has_entered[:] = False
+        self.keep_previous_state(0, len(self))
+        
+    def keep_previous_state(self, start, end):
+        self.prev_y[start:end] = self.y[start:end]
+        self.prev_scale[start:end] = self.scale[start:end]
+        self.prev_rotation[start:end] = self.rotation[start:end]
+        self.prev_flip_progress[start:end] = self.flip_progress[start:end]
+        
+    def update(self, start, end):
+        # Step the cards in [start, end), plus any card still turning outside
+        # it, so a pair turned back down while scrolled away finishes its flip
+        if self.turning:
+            self.update_turning([index for index in self.turning if not start <= index < end])
+        self.update_range(start, end)
+        self.turning = {index for index in self.turning if self.is_flipping[index]}
+        
+    def update_turning(self, indices):
+        if not indices:
+            return
+        indices = np.array(indices)
+        self.prev_flip_progress[indices] = self.flip_progress[indices]
+        is_flipping, is_flipped, flip_progress = self.is_flipping[indices], self.is_flipped[indices], self.flip_progress[indices]
+        self.step_flips(is_flipping, is_flipped, flip_progress)
+        self.is_flipping[indices], self.is_flipped[indices], self.flip_progress[indices] = is_flipping, is_flipped, flip_progress
+        
+    def update_range(self, start, end):
+        # The slices below are views into the arrays
+        self.keep_previous_state(start, end)
+        y, scale, rotation = self.y[start:end], self.scale[start:end], self.rotation[start:end]
+        original_y, delay = self.original_y[start:end], self.entrance_delay[start:end]
+        has_entered, is_flipped = self.has_entered[start:end], self.is_flipped[start:end]
+        is_flipping, flip_progress = self.is_flipping[start:end], self.flip_progress[start:end]
+        
+        # Handle entrance animation; settled boards skip the masked work entirely.
+        # Masked-out cards get + 0.0 and * 1.0, which leaves them exactly as they were
+        entering = ~has_entered
+        if entering.any():
+            waiting = entering & (delay > 0)
+            delay -= waiting
+            moving = entering & ~waiting
+            if moving.any():
+                # Move toward original position
+                y += np.where(moving, (original_y - y) * 0.1, 0.0)
+                scale += np.where(moving, (1.0 - scale) * 0.1, 0.0)
+                rotation *= np.where(moving, 0.9, 1.0)
+                
+                arrived = moving & (np.abs(y - original_y) < 1) & (np.abs(scale - 1.0) < 0.01)
+                np.copyto(y, original_y, where=arrived)
+                np.copyto(scale, 1.0, where=arrived)
+                np.copyto(rotation, 0.0, where=arrived)
+                has_entered |= arrived
+            
+        # Flips advance even while a card waits out its entrance, since a card
+        # can be picked then and the board resolves it on its own timer
+        if is_flipping.any():
+            self.step_flips(is_flipping, is_flipped, flip_progress)
+            
+    def step_flips(self, is_flipping, is_flipped, flip_progress):
+        # Handle flip animation, back to front and front to back
+        flip_progress += np.where(is_flipped, -FLIP_SPEED, FLIP_SPEED) * is_flipping
+        np.maximum(np.minimum(flip_progress, 100, out=flip_progress), 0, out=flip_progress)
+        done = is_flipping & (flip_progress == np.where(is_flipped, 0, 100))
+        is_flipping &= ~done
+        is_flipped ^= done
+
+def card_field(name):
+    # A Card attribute backed by the store's array of that name, read as a Python scalar
+    def get(self):
+        return getattr(self.store, name).item(self.index)
+    def set(self, value):
+        getattr(self.store, name)[self.index] = value
+    return property(get, set)
+
+# Card class: a view of one card in a CardStore
 class Card:
-    def __init__(self, x, y, card_type):
-        self.x = x
-        self.y = y
-        self.width = CARD_WIDTH
-        self.height = CARD_HEIGHT
-        self.card_type = card_type
-        self.image = card_images[card_type - 1]
-        self.is_flipped = False
-        self.is_matched = False
-        self.flip_progress = 0  # 0: showing back, 100: showing front
-        self.is_flipping = False
-        self.rect = pygame.Rect(x, y, CARD_WIDTH, CARD_HEIGHT)
-        
-        # Animation properties
-        self.original_x = x
-        self.original_y = y
-        self.target_x = x
-        self.target_y = y
-        self.scale = 1.0
-        self.target_scale = 1.0
-        self.rotation = 0
-        self.entrance_delay = 0
-        self.has_entered = False
-        
-    def set_entrance_delay(self, delay):
-        self.entrance_delay = delay
-        self.scale = 0.1
-        self.rotation = random.randint(-30, 30)
-        self.y = self.original_y - 100
-        self.has_entered = False
+    __slots__ = ("store", "index", "drawn_state", "drawn_rect")
+    
+    card_type = card_field("card_type")
+    x = card_field("x")
+    original_x = x
+    original_y = card_field("original_y")
+    y = card_field("y")
+    scale = card_field("scale")
+    rotation = card_field("rotation")
+    flip_progress = card_field("flip_progress")
+    entrance_delay = card_field("entrance_delay")
+    is_flipped = card_field("is_flipped")
+    is_matched = card_field("is_matched")
+    is_flipping = card_field("is_flipping")
+    has_entered = card_field("has_entered")
+    
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        
+        # Last drawn appearance, used to report dirty regions
+        self.drawn_state = None
+        self.drawn_rect = None
+        
+    @property
+    def rect(self):
+        return pygame.Rect(self.x, self.original_y, CARD_WIDTH, CARD_HEIGHT)
+        
+    def draw(self, scroll_y, alpha=1.0):
+        # Fields are read straight from the store; faces are looked up per draw so
+        # generated ones can be evicted from the deck cache
+        store, i = self.store, self.index
+        x, card_type = store.x.item(i), store.card_type.item(i)
+        is_matched = store.is_matched.item(i)
+        
+        # Interpolate between the last two simulation steps
+        prev_y = store.prev_y.item(i)
+        y = prev_y + (store.y.item(i) - prev_y) * alpha
+        prev_flip_progress = store.prev_flip_progress.item(i)
+        flip_progress = prev_flip_progress + (store.flip_progress.item(i) - prev_flip_progress) * alpha
         
-    def draw(self):
         # Apply scale and rotation for entrance animation
-        if not self.has_entered:
-            card_surface = pygame.transform.rotozoom(
-                card_back_img if self.flip_progress < 50 else self.image,
-                self.rotation,
-                self.scale
+        if not store.has_entered.item(i):
+            prev_rotation, prev_scale = store.prev_rotation.item(i), store.prev_scale.item(i)
+            rotation = prev_rotation + (store.rotation.item(i) - prev_rotation) * alpha
+            showing_face = flip_progress >= 50
+            card_surface = entrance_cache.get(
+                card_type if showing_face else 0,
+                deck.face(card_type) if showing_face else assets.card_back(),
+                rotation,
+                prev_scale + (store.scale.item(i) - prev_scale) * alpha
             )
-            rect = card_surface.get_rect(center=(self.x + CARD_WIDTH//2, self.y + CARD_HEIGHT//2 - scroll_y))
+            rect = card_surface.get_rect(center=(x + CARD_WIDTH//2, y + CARD_HEIGHT//2 - scroll_y))
             screen.blit(card_surface, rect.topleft)
+            profiler.add("draw_calls")
+            self.report_dirty(rect, flip_progress, is_matched, rotation)
             return
             
-        # Calculate card width based on flip progress
-        if self.is_flipping:
-            flip_width = int(CARD_WIDTH * abs(50 - self.flip_progress) / 50)
-            if flip_width < 5:
-                flip_width = 5  # Minimum width during flip
-        else:
-            flip_width = CARD_WIDTH
-            
-        # Determine which image to show based on flip progress
-        if self.flip_progress < 50:
-            # Show back of card (flipping to front)
-            card_surface = pygame.transform.scale(card_back_img, (flip_width, CARD_HEIGHT))
+        showing_face = flip_progress >= 50
+        
+        # Settled cards blit the original surface directly
+        if not store.is_flipping.item(i):
+            rect = screen.blit(deck.face(card_type) if showing_face else assets.card_back(), (x, y - scroll_y))
         else:
-            # Show front of card (flipping to back)
-            card_surface = pygame.transform.scale(self.image, (flip_width, CARD_HEIGHT))
+            # Calculate card width based on flip progress
+            flip_width = flip_cache.quantize(int(CARD_WIDTH * abs(50 - flip_progress) / 50))
+            card_surface = flip_cache.get(card_type, showing_face, flip_width)
             
-        # Center the card at its position, adjusted for scrolling
-        offset_x = (CARD_WIDTH - flip_width) // 2
-        screen.blit(card_surface, (self.x + offset_x, self.y - scroll_y))
+            # Center the card at its position, adjusted for scrolling
+            offset_x = (CARD_WIDTH - flip_width) // 2
+            rect = screen.blit(card_surface, (x + offset_x, y - scroll_y))
         
         # If card is matched, add a subtle highlight
-        if self.is_matched:
-            s = pygame.Surface((CARD_WIDTH, CARD_HEIGHT), pygame.SRCALPHA)
-            s.fill((255, 255, 255, 80))  # Semi-transparent white
-            screen.blit(s, (self.x, self.y - scroll_y))
+        if is_matched:
+            screen.blit(overlay_surface((CARD_WIDTH, CARD_HEIGHT), WHITE, 80), (x, y - scroll_y))  # Semi-transparent white
+        profiler.add("draw_calls", 2 if is_matched else 1)
+            
+        self.report_dirty(rect, flip_progress, is_matched, 0)
+            
+    def report_dirty(self, rect, flip_progress, is_matched, rotation):
+        # Report both the old and new regions when the card's appearance changed
+        if not dirty_rects.enabled:
+            return
+        state = (rect.topleft, rect.size, flip_progress, is_matched, rotation)
+        if state != self.drawn_state:
+            dirty_rects.add(rect)
+            dirty_rects.add(self.drawn_rect)
+            self.drawn_state = state
+            self.drawn_rect = rect
             
-    def update(self):
-        # Handle entrance animation
-        if not self.has_entered:
-            if self.entrance_delay > 0:
-                self.entrance_delay -= 1
-                return
-                
-            # Move toward original position
-            self.y += (self.original_y - self.y) * 0.1
-            self.scale += (1.0 - self.scale) * 0.1
-            self.rotation *= 0.9
-            
-            if abs(self.y - self.original_y) < 1 and abs(self.scale - 1.0) < 0.01:
-                self.y = self.original_y
-                self.scale = 1.0
-                self.rotation = 0
-                self.has_entered = True
-                
-        # Handle flip animation
-        if self.is_flipping:
-            if not self.is_flipped:
-                # Flipping from back to front
-                self.flip_progress += FLIP_SPEED
-                if self.flip_progress >= 100:
-                    self.flip_progress = 100
-                    self.is_flipping = False
-                    self.is_flipped = True
-            else:
-                # Flipping from front to back
-                self.flip_progress -= FLIP_SPEED
-                if self.flip_progress <= 0:
-                    self.flip_progress = 0
-                    self.is_flipping = False
-                    self.is_flipped = False
-                    
     def flip(self):
         if not self.is_matched and not self.is_flipping:
             self.is_flipping = True
-            flip_sound.play()
+            self.store.turning.add(self.index)
+            play_sound("flip")
             
     def contains_point(self, point):
         return self.rect.collidepoint(point)
 
+# Board hit-testing by grid arithmetic instead of scanning every card
+class GridHitIndex:
+    def __init__(self, columns, card_count, origin_x=None, origin_y=None):
+        self.columns = columns
+        self.card_count = card_count
+        self.origin_x = GRID_OFFSET_X if origin_x is None else origin_x
+        self.origin_y = GRID_OFFSET_Y if origin_y is None else origin_y
+        
+    def card_at(self, x, y):
+        # Map a board-space point to the index of the card slot under it, or None
+        col, offset_x = divmod(x - self.origin_x, CARD_WIDTH + CARD_MARGIN)
+        row, offset_y = divmod(y - self.origin_y, CARD_HEIGHT + CARD_MARGIN)
+        if col < 0 or row < 0 or col >= self.columns:
+            return None
+        if offset_x >= CARD_WIDTH or offset_y >= CARD_HEIGHT:
+            return None  # Point is in the margin between cards
+        index = int(row * self.columns + col)
+        return index if index < self.card_count else None
+
 # Button class
 class Button:
     def __init__(self, x, y, width, height, text, color=BLUE, hover_color=LIGHT_BLUE):
@@ -311,15 +1255,20 @@ class Button:
         self.color = color
         self.hover_color = hover_color
         self.is_hovered = False
+        self.drawn_color = None
         
     def draw(self):
         color = self.hover_color if self.is_hovered else self.color
+        if color != self.drawn_color:
+            dirty_rects.add(self.rect)
+            self.drawn_color = color
         pygame.draw.rect(screen, color, self.rect, border_radius=10)
         pygame.draw.rect(screen, BLACK, self.rect, 3, border_radius=10)
         
-        text_surf = button_font.render(self.text, True, WHITE)
+        text_surf = render_text(assets.font("button"), self.text, WHITE)
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
+        profiler.add("draw_calls", 3)
         
     def check_hover(self, pos):
         self.is_hovered = self.rect.collidepoint(pos)
@@ -328,135 +1277,447 @@ class Button:
     def check_click(self, pos, click):
         return self.rect.collidepoint(pos) and click
 
-# Particle effect for matches
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = random.randint(5, 10)
-        self.vx = random.uniform(-3, 3)
-        self.vy = random.uniform(-3, 3)
-        self.lifetime = random.randint(30, 60)  # frames
+# Particle effect for matches, stored as fixed-capacity NumPy arrays
+MAX_PARTICLES = 4096
+
+class ParticleSystem:
+    def __init__(self, capacity=MAX_PARTICLES, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.position = np.zeros((capacity, 2), dtype=np.float32)
+        self.previous = np.zeros((capacity, 2), dtype=np.float32)  # Position one step ago, for interpolation
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)  # frames
+        self.color = np.zeros(capacity, dtype=np.uint8)  # Index into self.palette
+        self.palette = []
+        self.sprites = {}  # (color index, radius) -> pre-rendered circle
+        self.rng = np.random.default_rng(seed)
+        
+    def clear(self):
+        self.count = 0
+        
+    def emit(self, x, y, count, color):
+        # Spawn particles into the free tail of the arrays, dropping any overflow
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        if color not in self.palette:
+            self.palette.append(color)
+        start, end = self.count, self.count + count
+        self.position[start:end] = (x, y)
+        self.previous[start:end] = (x, y)
+        self.velocity[start:end] = self.rng.uniform(-3, 3, (count, 2))
+        self.size[start:end] = self.rng.integers(5, 10, count, endpoint=True)
+        self.lifetime[start:end] = self.rng.integers(30, 60, count, endpoint=True)
+        self.color[start:end] = self.palette.index(color)
+        self.count = end
         
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.lifetime -= 1
-        self.size = max(0, self.size - 0.1)
-        return self.lifetime > 0
+        n = self.count
+        if n == 0:
+            return
+        self.previous[:n] = self.position[:n]
+        self.position[:n] += self.velocity[:n]
+        self.lifetime[:n] -= 1
+        np.maximum(self.size[:n] - 0.1, 0, out=self.size[:n])
         
-    def draw(self):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), int(self.size))
+        # Compact live particles to the front of the arrays
+        alive = np.flatnonzero(self.lifetime[:n] > 0)
+        if len(alive) < n:
+            for array in (self.position, self.previous, self.velocity, self.size, self.lifetime, self.color):
+                array[:len(alive)] = array[alive]
+            self.count = len(alive)
+            
+    def sprite(self, color_index, radius):
+        sprite = self.sprites.get((color_index, radius))
+        if sprite is None:
+            sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            profiler.add("surface_allocs")
+            pygame.draw.circle(sprite, self.palette[color_index], (radius, radius), radius)
+            self.sprites[(color_index, radius)] = sprite
+        return sprite
+        
+    def draw(self, surface, offset_y=0, alpha=1.0):
+        n = self.count
+        if n == 0:
+            return
+        radii = self.size[:n].astype(np.int32)
+        position = self.previous[:n] + (self.position[:n] - self.previous[:n]) * alpha
+        corners = position.astype(np.int32) - radii[:, None]
+        corners[:, 1] += offset_y
+        batch = [
+            (self.sprite(color_index, radius), (x, y))
+            for color_index, radius, (x, y) in zip(self.color[:n].tolist(), radii.tolist(), corners.tolist())
+            if radius > 0
+        ]
+        rects = surface.blits(batch, doreturn=dirty_rects.enabled)
+        profiler.add("draw_calls", len(batch))
+        if rects:
+            for rect in rects:
+                dirty_rects.add(rect)
+
+# Input sources: live SDL input, optionally recorded, or a recorded log played back.
+# A log holds the game seed, the window size play started at and, per frame,
+# the frame time, the mouse position and the events the game reacts to,
+# zlib-compressed. Later size changes are recorded as VIDEORESIZE events.
+REPLAY_MAGIC = b"MMRP"
+REPLAY_VERSION = 4
+REPLAY_HEADER = struct.Struct("<4sBQHHHH")  # magic, version, seed, custom grid columns, rows, window width, height
+REPLAY_MAX_SEED = 2 ** 64 - 1  # Q field
+REPLAY_MAX_SIDE = 0xFFFF  # H fields: grid and window sides
+REPLAY_FRAME = struct.Struct("<HhhB")  # frame time in ms, mouse x, mouse y, event count
+REPLAY_EVENT = struct.Struct("<BI")  # event kind, button, key, wheel ticks or window size (width << 16 | height)
+REPLAY_EVENT_KINDS = [pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.VIDEOEXPOSE, pygame.VIDEORESIZE,
+                      pygame.MOUSEMOTION, pygame.MOUSEWHEEL]
+
+# Only these event types are queued by SDL; everything else is dropped at the source
+INPUT_EVENTS = [pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.KEYDOWN, pygame.VIDEOEXPOSE, pygame.VIDEORESIZE]
+CLICK_BUFFER = 4  # Clicks held while a transition plays; older ones are dropped
+
+def configure_event_queue():
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(INPUT_EVENTS)
+    
+def coalesce_events(events):
+    # Collapse a frame's bursts: wheel ticks into one MOUSEWHEEL with the net
+    # ticks (up is positive), any motion into one MOUSEMOTION and repeated
+    # resizes into the last. Clicks and keys pass through in order.
+    coalesced = []
+    wheel = 0
+    moved = False
+    resize = None
+    for event in events:
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button in (4, 5):
+            wheel += 1 if event.button == 4 else -1
+        elif event.type == pygame.MOUSEMOTION:
+            moved = True
+        elif event.type == pygame.VIDEORESIZE:
+            resize = event
+        else:
+            coalesced.append(event)
+    if moved:
+        coalesced.append(pygame.event.Event(pygame.MOUSEMOTION))
+    if wheel:
+        coalesced.append(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=wheel))
+    if resize:
+        coalesced.append(resize)
+    return coalesced
+
+class LiveInput:
+    is_replay = False
+    
+    def poll(self):
+        return pygame.mouse.get_pos(), coalesce_events(pygame.event.get())
+        
+    def end_frame(self, dt_ms):
+        pass
+
+class InputRecorder(LiveInput):
+    def __init__(self, seed, custom_grid=None, size=(BASE_WIDTH, BASE_HEIGHT)):
+        self.seed = seed
+        self.custom_grid = custom_grid
+        self.size = size
+        self.frames = bytearray()
+        self.frame_count = 0
+        self.mouse_pos = (0, 0)
+        self.events = []
+        
+    def poll(self):
+        mouse_pos, events = super().poll()
+        self.mouse_pos = mouse_pos
+        for event in events:
+            if event.type in REPLAY_EVENT_KINDS:
+                if event.type == pygame.VIDEORESIZE:
+                    code = event.w << 16 | event.h
+                elif event.type == pygame.MOUSEWHEEL:
+                    code = event.y & 0xFFFFFFFF
+                else:
+                    code = getattr(event, "button", 0) or getattr(event, "key", 0)
+                self.events.append((REPLAY_EVENT_KINDS.index(event.type), code))
+        return mouse_pos, events
+        
+    def end_frame(self, dt_ms):
+        self.frames += REPLAY_FRAME.pack(min(dt_ms, 0xFFFF), *self.mouse_pos, len(self.events))
+        for kind, code in self.events:
+            self.frames += REPLAY_EVENT.pack(kind, code)
+        self.events = []
+        self.frame_count += 1
+        
+    def save(self, path):
+        if self.events:
+            self.end_frame(0)  # Keep events from a frame cut short by quitting
+        columns, rows = self.custom_grid or (0, 0)
+        with open(path, "wb") as f:
+            f.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, columns, rows, *self.size))
+            f.write(zlib.compress(bytes(self.frames)))
+
+class ReplayInput:
+    is_replay = True
+    
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed, columns, rows, width, height = REPLAY_HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a Memory Match replay log")
+        self.custom_grid = (columns, rows) if columns else None
+        self.size = (width, height)
+        self.frames = zlib.decompress(data[REPLAY_HEADER.size:])
+        self.offset = 0
+        
+    @property
+    def finished(self):
+        return self.offset >= len(self.frames)
+        
+    def next_frame(self):
+        # Decode the next frame; returns its frame time in ms
+        dt_ms, x, y, count = REPLAY_FRAME.unpack_from(self.frames, self.offset)
+        self.offset += REPLAY_FRAME.size
+        self.mouse_pos = (x, y)
+        self.events = []
+        for _ in range(count):
+            kind, code = REPLAY_EVENT.unpack_from(self.frames, self.offset)
+            self.offset += REPLAY_EVENT.size
+            event_type = REPLAY_EVENT_KINDS[kind]
+            if event_type == pygame.MOUSEBUTTONDOWN:
+                event = pygame.event.Event(event_type, button=code, pos=self.mouse_pos)
+            elif event_type == pygame.KEYDOWN:
+                event = pygame.event.Event(event_type, key=code)
+            elif event_type == pygame.VIDEORESIZE:
+                event = pygame.event.Event(event_type, w=code >> 16, h=code & 0xFFFF, size=(code >> 16, code & 0xFFFF))
+            elif event_type == pygame.MOUSEWHEEL:
+                event = pygame.event.Event(event_type, x=0, y=code - (1 << 32) if code >> 31 else code)
+            else:
+                event = pygame.event.Event(event_type)
+            self.events.append(event)
+        return dt_ms
+        
+    def poll(self):
+        # Live input is drained so the queue never backs up; of it, only closing
+        # the window is honored
+        events = self.events
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            events = events + [pygame.event.Event(pygame.QUIT)]
+        return self.mouse_pos, events
+        
+    def end_frame(self, dt_ms):
+        pass
 
 # Game class
 class MemoryGame:
-    def __init__(self):
-        self.state = GameState.MENU
+    def __init__(self, custom_grid=None, seed=None, input_source=None, loader=None, scores=None):
+        # Every source of randomness derives from one seed so games can be replayed;
+        # purely cosmetic effects draw from their own generator
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.effects_rng = random.Random(f"{self.seed}:effects")  # Distinct stream from the gameplay seed
+        self.input = input_source if input_source is not None else LiveInput()
+        self.running = True  # Cleared when the window is closed; main() then shuts down
+        
+        # With a background loader the game opens on the loading screen
+        self.loader = loader
+        self.state = GameState.LOADING if loader is not None else GameState.MENU
         self.grid_size = (4, 4)  # 4x4 grid = 16 cards = 8 pairs
+        self.board = Board(*self.grid_size, rng=self.rng)
+        self.card_store = CardStore()
         self.cards = []
-        self.flipped_cards = []
-        self.moves = 0
-        self.matches = 0
-        self.particles = []
-        self.start_time = 0
-        self.elapsed_time = 0
-        self.is_checking = False
+        self.hit_index = GridHitIndex(self.grid_size[0], 0)
+        self.particles = ParticleSystem(seed=self.rng.getrandbits(64))
         self.check_timer = 0
-        self.difficulty = "Medium"  # Easy, Medium, Hard
+        
+        # Finished games are kept in the score store, when there is one
+        self.scores = scores
+        self.best = None  # (seconds, moves) best before the last game, if any
+        self.new_best = False
+        
+        # Scrolling
+        self.scroll_y = 0
+        self.max_scroll_y = 0  # Will be calculated based on card positions
+        self.difficulty = "Medium"  # Easy, Medium, Hard, Custom
+        self.custom_grid = custom_grid  # (columns, rows) for the Custom difficulty
+        self.layout_columns = self.grid_size[0]
+        self.prefetched_scroll = None  # Scroll position whose nearby faces were last prefetched
         self.transition = Transition()
         self.feedback_message = ""
         self.feedback_timer = 0
+        self.layers = LayerCompositor()
+        self.clicks = deque(maxlen=CLICK_BUFFER)  # Click positions not yet handled
+        self.hover_state = None  # Screen whose buttons last had hover computed
+        self.hover_stale = False
+        self.drawn_state = None
+        self.drawn_hud = None
+        self.hud_labels = {name: HudLabel("info") for name in ("moves", "matches", "time", "difficulty")}
         
-        # Create buttons
-        self.start_button = Button(SCREEN_WIDTH//2 - 100, 300, 200, 60, "Start Game")
-        self.easy_button = Button(SCREEN_WIDTH//2 - 220, 400, 120, 50, "Easy", GREEN)
-        self.medium_button = Button(SCREEN_WIDTH//2 - 60, 400, 120, 50, "Medium", BLUE)
-        self.hard_button = Button(SCREEN_WIDTH//2 + 100, 400, 120, 50, "Hard", RED)
-        self.menu_button = Button(SCREEN_WIDTH//2 - 100, 400, 200, 60, "Main Menu")
-        self.restart_button = Button(SCREEN_WIDTH//2 - 100, 480, 200, 60, "Play Again")
+        # Create buttons; layout_widgets() places them for the window size
+        self.start_button = Button(0, 0, 0, 0, "Start Game")
+        self.easy_button = Button(0, 0, 0, 0, "Easy", GREEN)
+        self.medium_button = Button(0, 0, 0, 0, "Medium", BLUE)
+        self.hard_button = Button(0, 0, 0, 0, "Hard", RED)
+        self.menu_button = Button(0, 0, 0, 0, "Main Menu")
+        self.restart_button = Button(0, 0, 0, 0, "Play Again")
+        self.layout_widgets()
         
         # Set active difficulty button
         self.easy_button.is_hovered = False
         self.medium_button.is_hovered = True
         self.hard_button.is_hovered = False
         
+        if loader is not None:
+            self.loading_label = pygame.font.Font(None, 48).render("Loading...", True, YELLOW)
+            loader.start()
+            
+        # A custom grid size starts selected in place of the difficulty buttons
+        if custom_grid is not None:
+            self.difficulty = "Custom"
+            self.medium_button.is_hovered = False
+        
+    def layout_widgets(self):
+        # Button positions in the base layout, scaled and centered in the window
+        center = SCREEN_WIDTH // 2
+        self.start_button.rect = pygame.Rect(center - ui(100), ui(300), ui(200), ui(60))
+        self.easy_button.rect = pygame.Rect(center - ui(220), ui(400), ui(120), ui(50))
+        self.medium_button.rect = pygame.Rect(center - ui(60), ui(400), ui(120), ui(50))
+        self.hard_button.rect = pygame.Rect(center + ui(100), ui(400), ui(120), ui(50))
+        self.menu_button.rect = pygame.Rect(center - ui(100), ui(400), ui(200), ui(60))
+        self.restart_button.rect = pygame.Rect(center - ui(100), ui(480), ui(200), ui(60))
+        
+    def layout_cards(self):
+        # Wide custom grids reflow into as many columns as fit in the window
+        self.layout_columns = min(self.grid_size[0], MAX_GRID_COLUMNS)
+        layout_rows = math.ceil(len(self.cards) / self.layout_columns)
+        self.card_store.place(self.layout_columns)
+            
+        # Cards sit on a uniform grid, so clicks resolve by arithmetic
+        self.hit_index = GridHitIndex(self.layout_columns, len(self.cards))
+        
+        # Calculate max scroll value based on the bottom row
+        max_card_bottom = GRID_OFFSET_Y + layout_rows * (CARD_HEIGHT + CARD_MARGIN) - CARD_MARGIN + ui(50)  # Add some padding
+        self.max_scroll_y = max(0, max_card_bottom - SCREEN_HEIGHT)
+        self.scroll_y = min(self.scroll_y, self.max_scroll_y)
+        self.prefetched_scroll = None
+        
+    def relayout(self):
+        # Rebuild everything sized to the window after apply_layout()
+        self.layers.invalidate()
+        self.layout_widgets()
+        for button in (self.start_button, self.easy_button, self.medium_button, self.hard_button, self.menu_button, self.restart_button):
+            button.drawn_color = None
+        if self.cards:
+            self.layout_cards()
+            flip_cache.build(self.board.cards)
+            
     def setup_game(self):
         # Set grid size based on difficulty
-        if self.difficulty == "Easy":
-            self.grid_size = (3, 2)  # 6 cards = 3 pairs
-        elif self.difficulty == "Medium":
-            self.grid_size = (4, 3)  # 12 cards = 6 pairs
-        else:  # Hard
-            self.grid_size = (6, 3)  # 18 cards = 9 pairs (rearranged to fit better on screen)
-            
-        # Reset game state
-        self.cards = []
-        self.flipped_cards = []
-        self.moves = 0
-        self.matches = 0
-        self.particles = []
-        self.start_time = time.time()
-        self.elapsed_time = 0
-        self.is_checking = False
+        if self.difficulty == "Custom":
+            self.grid_size = self.custom_grid
+        else:
+            self.grid_size = DIFFICULTY_GRIDS[self.difficulty]
+            
+        # Reset game state; the board deals a shuffled deck of pairs, with faces
+        # past the drawn set generated by the deck provider
+        self.board = Board(*self.grid_size, rng=self.rng)
+        self.particles.clear()
         
         # Reset scroll position
-        global scroll_y, max_scroll_y
-        scroll_y = 0
-        
-        # Create card pairs
-        pairs_needed = (self.grid_size[0] * self.grid_size[1]) // 2
-        card_types = list(range(1, pairs_needed + 1))
-        card_types = card_types + card_types  # Duplicate to create pairs
-        random.shuffle(card_types)
-        
-        # Create and position cards
-        card_index = 0
-        for row in range(self.grid_size[1]):
-            for col in range(self.grid_size[0]):
-                x = GRID_OFFSET_X + col * (CARD_WIDTH + CARD_MARGIN)
-                y = GRID_OFFSET_Y + row * (CARD_HEIGHT + CARD_MARGIN)
-                
-                if card_index < len(card_types):
-                    card = Card(x, y, card_types[card_index])
-                    card.set_entrance_delay(card_index * 5)  # Stagger the entrance of cards
-                    self.cards.append(card)
-                    card_index += 1
+        self.scroll_y = 0
         
-        # Calculate max scroll value based on the bottom-most card
-        if self.cards:
-            bottom_card = max(self.cards, key=lambda card: card.y + card.height)
-            max_card_bottom = bottom_card.y + bottom_card.height + 50  # Add some padding
-            max_scroll_y = max(0, max_card_bottom - SCREEN_HEIGHT)
+        card_types = self.board.cards
         
-    def handle_events(self):
-        # Only handle events if not in transition
-        if self.transition.is_active:
-            return
+        # Create the cards and place them on the grid
+        self.card_store = CardStore(card_types)
+        self.cards = [Card(self.card_store, index) for index in range(len(card_types))]
+        self.layout_cards()
+        
+        # Stagger the entrance of cards one screenful at a time, so cards
+        # further down a large board cascade in when they are scrolled to
+        rows_per_screen = math.ceil((SCREEN_HEIGHT - GRID_OFFSET_Y) / (CARD_HEIGHT + CARD_MARGIN))
+        cards_per_screen = self.layout_columns * rows_per_screen
+        self.card_store.start_entrance(
+            [card_index % cards_per_screen * 5 for card_index in range(len(self.cards))],
+            [self.rng.randint(-30, 30) for _ in self.cards]
+        )
+            
+        # Pre-render the flip animation frames for this deck
+        flip_cache.build(card_types)
+        
+    def visible_range(self, margin_rows=CULL_MARGIN_ROWS):
+        # Indices of the cards in the rows overlapping the viewport, plus a margin of rows
+        pitch_y = CARD_HEIGHT + CARD_MARGIN
+        first_row = max(0, (self.scroll_y - GRID_OFFSET_Y) // pitch_y - margin_rows)
+        last_row = (self.scroll_y + SCREEN_HEIGHT - GRID_OFFSET_Y) // pitch_y + margin_rows
+        return first_row * self.layout_columns, min(len(self.cards), (last_row + 1) * self.layout_columns)
+        
+    def visible_cards(self, margin_rows=CULL_MARGIN_ROWS):
+        start, end = self.visible_range(margin_rows)
+        return self.cards[start:end]
+        
+    def resize_window(self, size):
+        global windowed_size
+        if self.input.is_replay:
+            # Recorded sizes are applied to the window too, not just the layout
+            if size != screen.get_size():
+                set_display_mode(size)
+        elif not screen.get_flags() & pygame.FULLSCREEN:
+            windowed_size = size  # Leaving fullscreen restores the dragged size
+        if apply_layout(*size):
+            self.relayout()
             
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_clicked = False
-        global scroll_y, max_scroll_y
+    def handle_events(self):
+        # The queue is drained every frame, even during transitions, so it never backs up
+        mouse_pos, events = self.input.poll()
+        moved = False
         
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.running = False
+                return
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left click
-                    mouse_clicked = True
-                elif event.button == 4:  # Mouse wheel up
-                    scroll_y = max(0, scroll_y - SCROLL_SPEED)
-                elif event.button == 5:  # Mouse wheel down
-                    scroll_y = min(max_scroll_y, scroll_y + SCROLL_SPEED)
+                if event.button == 1:  # Left click, handled where the mouse was this frame
+                    self.clicks.append(mouse_pos)
+            elif event.type == pygame.MOUSEWHEEL:
+                # One coalesced event carries every wheel tick of the frame
+                self.scroll_y = max(0, min(self.max_scroll_y, self.scroll_y - event.y * SCROLL_SPEED))
+                dirty_rects.add_full()
+            elif event.type == pygame.MOUSEMOTION:
+                moved = True
+            elif event.type == pygame.VIDEOEXPOSE:
+                dirty_rects.add_full()
+            elif event.type == pygame.VIDEORESIZE:
+                self.resize_window(event.size)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F11:
+                # A replay leaves the real window alone; the recorded resize that
+                # followed the toggle carries the size
+                if not self.input.is_replay:
+                    toggle_fullscreen()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                # Toggle the performance overlay
+                profiler.enable()
+                profiler.show_overlay = not profiler.show_overlay
+                dirty_rects.add_full()
+                
+        # Hover only changes when the mouse moves or the screen changes
+        self.hover_stale = self.hover_stale or moved
+        
+        # Clicks wait out transitions in the buffer and are then handled one per frame
+        if self.transition.is_active:
+            return
+        hover_pos = mouse_pos
+        mouse_clicked = bool(self.clicks)
+        if mouse_clicked:
+            mouse_pos = self.clicks.popleft()
+        update_hover = self.hover_stale or self.state != self.hover_state
+        self.hover_stale = False
+        self.hover_state = self.state
                     
         if self.state == GameState.MENU:
             # Check button interactions
-            self.start_button.check_hover(mouse_pos)
-            self.easy_button.check_hover(mouse_pos)
-            self.medium_button.check_hover(mouse_pos)
-            self.hard_button.check_hover(mouse_pos)
-            
+            if update_hover:
+                self.start_button.check_hover(hover_pos)
+                self.easy_button.check_hover(hover_pos)
+                self.medium_button.check_hover(hover_pos)
+                self.hard_button.check_hover(hover_pos)
+                
             if self.start_button.check_click(mouse_pos, mouse_clicked):
                 def start_game():
                     self.state = GameState.PLAYING
@@ -473,7 +1734,7 @@ class MemoryGame:
                 self.medium_button.color = BLUE
                 self.hard_button.color = RED
                 # Sound feedback
-                flip_sound.play()
+                play_sound("flip")
                 # Text feedback
                 self.feedback_message = "Easy mode selected!"
                 self.feedback_timer = 90  # Show for 1.5 seconds
@@ -488,7 +1749,7 @@ class MemoryGame:
                 self.medium_button.color = (0, 80, 200)  # Brighter blue
                 self.hard_button.color = RED
                 # Sound feedback
-                flip_sound.play()
+                play_sound("flip")
                 # Text feedback
                 self.feedback_message = "Medium mode selected!"
                 self.feedback_timer = 90  # Show for 1.5 seconds
@@ -503,34 +1764,25 @@ class MemoryGame:
                 self.medium_button.color = BLUE
                 self.hard_button.color = (200, 0, 0)  # Brighter red
                 # Sound feedback
-                flip_sound.play()
+                play_sound("flip")
                 # Text feedback
                 self.feedback_message = "Hard mode selected!"
                 self.feedback_timer = 90  # Show for 1.5 seconds
                 
         elif self.state == GameState.PLAYING:
             # Only allow card clicks if not currently checking a pair
-            if not self.is_checking and mouse_clicked:
-                # Adjust mouse position for scrolling
-                adjusted_mouse_pos = (mouse_pos[0], mouse_pos[1] + scroll_y)
-                for card in self.cards:
-                    # Create a rect that accounts for scrolling
-                    card_rect = pygame.Rect(card.x, card.y, card.width, card.height)
-                    if card_rect.collidepoint(adjusted_mouse_pos) and not card.is_flipped and not card.is_matched:
-                        if len(self.flipped_cards) < 2:
-                            card.flip()
-                            self.flipped_cards.append(card)
-                            
-                            if len(self.flipped_cards) == 2:
-                                self.moves += 1
-                                self.is_checking = True
-                                self.check_timer = 60  # Wait 1 second before checking
-                        break
+            if not self.board.is_checking and mouse_clicked:
+                # Adjust mouse position for scrolling; hit-test against the resting grid
+                # slots so animating cards stay clickable where they will land
+                index = self.hit_index.card_at(mouse_pos[0], mouse_pos[1] + self.scroll_y)
+                if index is not None:
+                    self.select_card(index)
                         
         elif self.state == GameState.GAME_OVER:
             # Check button interactions
-            self.menu_button.check_hover(mouse_pos)
-            self.restart_button.check_hover(mouse_pos)
+            if update_hover:
+                self.menu_button.check_hover(hover_pos)
+                self.restart_button.check_hover(hover_pos)
             
             if self.menu_button.check_click(mouse_pos, mouse_clicked):
                 def go_to_menu():
@@ -543,10 +1795,26 @@ class MemoryGame:
                     self.setup_game()
                 self.transition.start_fade_out(callback=restart_game)
                 
-    def update(self):
+    def select_card(self, index):
+        card = self.cards[index]
+        # Cards still animating back face down cannot be picked yet
+        if not card.is_flipping and self.board.flip(index):
+            card.flip()
+            
+            if self.board.is_checking:
+                self.check_timer = 60  # Wait 1 second before checking
+                
+    def update(self, dt=SIM_DT):
         # Update transition first
         state_changed = self.transition.update()
         
+        # Hand loaded assets over and move on to the menu once loading finishes
+        if self.state == GameState.LOADING and self.loader.is_done:
+            self.loader.finish()
+            startup_timer.mark("assets ready")
+            self.state = GameState.MENU
+            self.transition.start_fade_in()
+            
         # Update feedback message timer
         if self.feedback_timer > 0:
             self.feedback_timer -= 1
@@ -555,76 +1823,141 @@ class MemoryGame:
         
         if self.state == GameState.PLAYING:
             # Update elapsed time
-            self.elapsed_time = time.time() - self.start_time
+            self.board.advance(dt)
             
-            # Update cards
-            for card in self.cards:
-                card.update()
+            # Generate faces for the rows around the viewport before they scroll in
+            if self.scroll_y != self.prefetched_scroll:
+                start, end = self.visible_range(FACE_PREFETCH_ROWS)
+                deck.prefetch(self.card_store.card_type[start:end].tolist())
+                self.prefetched_scroll = self.scroll_y
+                
+            # Update cards in one vectorized step; off-screen cards are not ticked at all
+            self.card_store.update(*self.visible_range())
                 
             # Check for matches after delay
-            if self.is_checking:
+            if self.board.is_checking:
                 self.check_timer -= 1
                 if self.check_timer <= 0:
                     self.check_for_match()
                     
             # Update particles
-            self.particles = [p for p in self.particles if p.update()]
+            self.particles.update()
             
             # Check if game is over
-            if self.matches == len(self.cards) // 2 and not self.transition.is_active:
+            if self.board.is_won and not self.transition.is_active:
                 def end_game():
                     self.state = GameState.GAME_OVER
-                    win_sound.play()
+                    play_sound("win")
+                    self.record_score()
                 self.transition.start_fade_out(callback=end_game)
                 
+    def record_score(self):
+        if self.scores is None:
+            return
+        self.best = self.scores.best(self.difficulty, self.grid_size)
+        self.new_best = self.scores.record(self.difficulty, self.grid_size, self.board.moves, self.board.elapsed_time)
+        
     def check_for_match(self):
-        if len(self.flipped_cards) == 2:
-            card1, card2 = self.flipped_cards
+        result = self.board.resolve()
+        if result is not None:
+            first, second, matched = result
+            card1, card2 = self.cards[first], self.cards[second]
             
-            if card1.card_type == card2.card_type:
+            if matched:
                 # Match found
                 card1.is_matched = True
                 card2.is_matched = True
-                self.matches += 1
-                match_sound.play()
+                play_sound("match")
                 
                 # Create particles at both matched cards
-                for _ in range(20):
-                    self.particles.append(Particle(card1.x + CARD_WIDTH//2, card1.y + CARD_HEIGHT//2, YELLOW))
-                    self.particles.append(Particle(card2.x + CARD_WIDTH//2, card2.y + CARD_HEIGHT//2, YELLOW))
+                self.particles.emit(card1.x + CARD_WIDTH//2, card1.y + CARD_HEIGHT//2, 20, YELLOW)
+                self.particles.emit(card2.x + CARD_WIDTH//2, card2.y + CARD_HEIGHT//2, 20, YELLOW)
             else:
                 # No match
                 card1.flip()
                 card2.flip()
-                nomatch_sound.play()
+                play_sound("nomatch")
                 
-            self.flipped_cards = []
-            self.is_checking = False
-                
-    def draw(self):
-        if self.state == GameState.MENU:
-            # Draw menu screen
-            screen.fill(DARK_GRAY)
-            
-            # Draw background pattern
-            for i in range(0, SCREEN_WIDTH, 40):
-                for j in range(0, SCREEN_HEIGHT, 40):
-                    pygame.draw.rect(screen, (60, 60, 60), (i, j, 20, 20))
-            
-            # Title
-            title_text = title_font.render("Memory Match Game", True, YELLOW)
-            screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 100))
+    def build_background_layer(self):
+        layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        layer.fill(DARK_GRAY)
+        
+        # Draw background pattern
+        for i in range(0, SCREEN_WIDTH, ui(40)):
+            for j in range(0, SCREEN_HEIGHT, ui(40)):
+                pygame.draw.rect(layer, (60, 60, 60), (i, j, ui(20), ui(20)))
+        return layer
+        
+    def build_menu_layer(self):
+        layer = self.build_background_layer()
+        
+        # Title
+        title_text = render_text(assets.font("title"), "Memory Match Game", YELLOW)
+        layer.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, ui(100)))
+        
+        # Instructions
+        instructions = [
+            "Match pairs of cards by flipping them two at a time.",
+            "Remember card positions to find all matches quickly!",
+            "Select difficulty level:"
+        ]
+        
+        for i, instruction in enumerate(instructions):
+            text = render_text(assets.font("info"), instruction, WHITE)
+            layer.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, ui(180 + i*30)))
+        return layer
+        
+    def build_game_over_layer(self):
+        layer = self.build_background_layer()
+        
+        # Victory message
+        victory_text = render_text(assets.font("title"), "Congratulations!", YELLOW)
+        layer.blit(victory_text, (SCREEN_WIDTH//2 - victory_text.get_width()//2, ui(100)))
+        
+        # Game stats
+        stats = [
+            f"Difficulty: {self.difficulty}",
+            f"Moves: {self.board.moves}",
+            f"Time: {int(self.board.elapsed_time)} seconds"
+        ]
+        if self.new_best:
+            stats.append("New best time!")
+        elif self.best is not None:
+            # Separate records, usually set in different games
+            stats.append(f"Best time: {int(self.best[0])} seconds, fewest moves: {self.best[1]}")
+        
+        for i, stat in enumerate(stats):
+            text = render_text(assets.font("info"), stat, WHITE)
+            layer.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, ui(180 + i*30)))
+        return layer
+        
+    def draw(self, alpha=1.0):
+        # alpha is how far rendering is between the last two simulation steps
+        profiler.lap()
+        
+        # Any change of screen repaints the whole display
+        if self.state != self.drawn_state:
+            dirty_rects.add_full()
+            self.drawn_state = self.state
+            self.drawn_hud = None
             
-            # Instructions
-            instructions = [
-                "Match pairs of cards by flipping them two at a time.",
-                "Remember card positions to find all matches quickly!",
-                "Select difficulty level:"
-            ]
+        if self.state == GameState.LOADING:
+            # Draw loading screen: only rects and a label rendered before loading
+            # began, so the main thread never touches fonts the workers are loading
+            screen.fill(DARK_GRAY)
+            screen.blit(self.loading_label, (SCREEN_WIDTH//2 - self.loading_label.get_width()//2, ui(240)))
+            bar = pygame.Rect(SCREEN_WIDTH//2 - ui(200), ui(300), ui(400), ui(24))
+            pygame.draw.rect(screen, GRAY, bar, 2, border_radius=5)
+            pygame.draw.rect(screen, YELLOW, (bar.x + 4, bar.y + 4, int((bar.width - 8) * self.loader.progress), bar.height - 8))
+            dirty_rects.add_full()
+            profiler.add("draw_calls", 4)
+            profiler.lap("draw.widgets")
             
-            for i, instruction in enumerate(instructions):
-                text = info_font.render(instruction, True, WHITE)
-                screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 180 + i*30))
+        elif self.state == GameState.MENU:
+            # Draw menu screen
+            screen.blit(self.layers.get(GameState.MENU, self.build_menu_layer), (0, 0))
+            profiler.add("draw_calls")
+            profiler.lap("draw.background")
             
             # Draw buttons
             self.start_button.draw()
@@ -634,92 +1967,86 @@ class MemoryGame:
             
             # Draw feedback message if active
             if self.feedback_message:
-                feedback_text = button_font.render(self.feedback_message, True, YELLOW)
+                feedback_text = render_text(assets.font("button"), self.feedback_message, YELLOW)
                 feedback_bg = pygame.Rect(
-                    SCREEN_WIDTH//2 - feedback_text.get_width()//2 - 10,
-                    470,
-                    feedback_text.get_width() + 20,
-                    40
+                    SCREEN_WIDTH//2 - feedback_text.get_width()//2 - ui(10),
+                    ui(470),
+                    feedback_text.get_width() + ui(20),
+                    ui(40)
                 )
+                dirty_rects.add(feedback_bg)
                 pygame.draw.rect(screen, DARK_GRAY, feedback_bg)
                 pygame.draw.rect(screen, YELLOW, feedback_bg, 2, border_radius=5)
-                screen.blit(feedback_text, (SCREEN_WIDTH//2 - feedback_text.get_width()//2, 475))
+                screen.blit(feedback_text, (SCREEN_WIDTH//2 - feedback_text.get_width()//2, ui(475)))
+                profiler.add("draw_calls", 3)
+            profiler.lap("draw.widgets")
             
         elif self.state == GameState.PLAYING:
             # Draw game screen
-            screen.fill(DARK_GRAY)
-            
-            # Draw background pattern
-            for i in range(0, SCREEN_WIDTH, 40):
-                for j in range(0, SCREEN_HEIGHT, 40):
-                    pygame.draw.rect(screen, (60, 60, 60), (i, j, 20, 20))
+            screen.blit(self.layers.get(GameState.PLAYING, self.build_background_layer), (0, 0))
+            profiler.add("draw_calls")
+            profiler.lap("draw.background")
             
             # Draw cards
-            for card in self.cards:
-                card.draw()
+            for card in self.visible_cards():
+                card.draw(self.scroll_y, alpha)
+            profiler.lap("draw.cards")
                 
             # Draw particles
-            for particle in self.particles:
-                particle.draw()
+            self.particles.draw(screen, -self.scroll_y, alpha)
+            profiler.lap("draw.particles")
                 
             # Draw game info (fixed position, not affected by scrolling)
-            info_bg = pygame.Surface((SCREEN_WIDTH, 110))
-            info_bg.fill(DARK_GRAY)
-            info_bg.set_alpha(220)
+            info_bg = overlay_surface((SCREEN_WIDTH, ui(110)), DARK_GRAY, 220)
             screen.blit(info_bg, (0, 0))
             
-            moves_text = info_font.render(f"Moves: {self.moves}", True, WHITE)
-            screen.blit(moves_text, (20, 20))
+            hud = (self.board.moves, self.board.matches, int(self.board.elapsed_time), self.difficulty)
+            if hud != self.drawn_hud:
+                dirty_rects.add(info_bg.get_rect())
+                self.drawn_hud = hud
+            
+            moves_text = self.hud_labels["moves"].render(f"Moves: {self.board.moves}")
+            screen.blit(moves_text, (ui(20), ui(20)))
             
-            matches_text = info_font.render(f"Matches: {self.matches}/{len(self.cards)//2}", True, WHITE)
-            screen.blit(matches_text, (20, 50))
+            matches_text = self.hud_labels["matches"].render(f"Matches: {self.board.matches}/{self.board.pairs}")
+            screen.blit(matches_text, (ui(20), ui(50)))
             
-            time_text = info_font.render(f"Time: {int(self.elapsed_time)}s", True, WHITE)
-            screen.blit(time_text, (20, 80))
+            time_text = self.hud_labels["time"].render(f"Time: {int(self.board.elapsed_time)}s")
+            screen.blit(time_text, (ui(20), ui(80)))
             
-            difficulty_text = info_font.render(f"Difficulty: {self.difficulty}", True, WHITE)
-            screen.blit(difficulty_text, (SCREEN_WIDTH - 200, 20))
+            if self.difficulty == "Custom":
+                difficulty_text = self.hud_labels["difficulty"].render(f"Custom: {self.grid_size[0]}x{self.grid_size[1]}")
+            else:
+                difficulty_text = self.hud_labels["difficulty"].render(f"Difficulty: {self.difficulty}")
+            screen.blit(difficulty_text, (SCREEN_WIDTH - ui(200), ui(20)))
+            profiler.add("draw_calls", 5)
             
 # Draw scrollbar if needed
-            if max_scroll_y > 0:
+            if self.max_scroll_y > 0:
                 # Calculate scrollbar dimensions
-                scrollbar_height = max(30, SCREEN_HEIGHT * SCREEN_HEIGHT / (SCREEN_HEIGHT + max_scroll_y))
-                scrollbar_pos = (scroll_y / max_scroll_y) * (SCREEN_HEIGHT - scrollbar_height)
+                scrollbar_height = max(ui(30), SCREEN_HEIGHT * SCREEN_HEIGHT / (SCREEN_HEIGHT + self.max_scroll_y))
+                scrollbar_pos = (self.scroll_y / self.max_scroll_y) * (SCREEN_HEIGHT - scrollbar_height)
                 
                 # Draw scrollbar track
-                pygame.draw.rect(screen, GRAY, (SCREEN_WIDTH - 15, 0, 10, SCREEN_HEIGHT))
+                pygame.draw.rect(screen, GRAY, (SCREEN_WIDTH - ui(15), 0, ui(10), SCREEN_HEIGHT))
                 
                 # Draw scrollbar thumb
-                pygame.draw.rect(screen, WHITE, (SCREEN_WIDTH - 15, scrollbar_pos, 10, scrollbar_height), border_radius=5)
+                pygame.draw.rect(screen, WHITE, (SCREEN_WIDTH - ui(15), scrollbar_pos, ui(10), scrollbar_height), border_radius=5)
+                profiler.add("draw_calls", 2)
                 
             # Draw scroll indicator if scrolling is available
-            if max_scroll_y > 0:
-                scroll_text = info_font.render("Use mouse wheel to scroll", True, YELLOW)
-                screen.blit(scroll_text, (SCREEN_WIDTH//2 - scroll_text.get_width()//2, 80))
+            if self.max_scroll_y > 0:
+                scroll_text = render_text(assets.font("info"), "Use mouse wheel to scroll", YELLOW)
+                screen.blit(scroll_text, (SCREEN_WIDTH//2 - scroll_text.get_width()//2, ui(80)))
+                profiler.add("draw_calls")
+            profiler.lap("draw.hud")
             
         elif self.state == GameState.GAME_OVER:
             # Draw game over screen
-            screen.fill(DARK_GRAY)
-            
-            # Draw background pattern
-            for i in range(0, SCREEN_WIDTH, 40):
-                for j in range(0, SCREEN_HEIGHT, 40):
-                    pygame.draw.rect(screen, (60, 60, 60), (i, j, 20, 20))
-            
-            # Victory message
-            victory_text = title_font.render("Congratulations!", True, YELLOW)
-            screen.blit(victory_text, (SCREEN_WIDTH//2 - victory_text.get_width()//2, 100))
-            
-            # Game stats
-            stats = [
-                f"Difficulty: {self.difficulty}",
-                f"Moves: {self.moves}",
-                f"Time: {int(self.elapsed_time)} seconds"
-            ]
-            
-            for i, stat in enumerate(stats):
-                text = info_font.render(stat, True, WHITE)
-                screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 180 + i*30))
+            stats = (self.difficulty, self.board.moves, int(self.board.elapsed_time), self.best, self.new_best)
+            screen.blit(self.layers.get(GameState.GAME_OVER, self.build_game_over_layer, stats), (0, 0))
+            profiler.add("draw_calls")
+            profiler.lap("draw.background")
             
             # Draw buttons
             self.menu_button.draw()
@@ -727,27 +2054,157 @@ class MemoryGame:
             
             # Draw decorative elements
             for i in range(20):
-                x = random.randint(0, SCREEN_WIDTH)
-                y = random.randint(0, SCREEN_HEIGHT)
-                size = random.randint(3, 8)
-                color = random.choice([YELLOW, WHITE, PINK])
-                pygame.draw.circle(screen, color, (x, y), size)
+                x = self.effects_rng.randint(0, SCREEN_WIDTH)
+                y = self.effects_rng.randint(0, SCREEN_HEIGHT)
+                size = ui(self.effects_rng.randint(3, 8))
+                color = self.effects_rng.choice([YELLOW, WHITE, PINK])
+                dirty_rects.add(pygame.draw.circle(screen, color, (x, y), size))
+            profiler.add("draw_calls", 20)
+            profiler.lap("draw.widgets")
                 
         # Draw transition effect on top
         self.transition.draw(screen)
+        profiler.lap("draw.transition")
+
+def parse_window_size(value):
+    width, height = parse_size(value)
+    if width < 320 or height < 240:
+        raise argparse.ArgumentTypeError("the window must be at least 320x240")
+    if max(width, height) > REPLAY_MAX_SIDE:
+        raise argparse.ArgumentTypeError(f"window sides are limited to {REPLAY_MAX_SIDE}")
+    return width, height
+
+def parse_seed(value):
+    # Seeds are stored unsigned in replay logs, so reject them before play starts
+    try:
+        seed = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an integer, got {value!r}")
+    if not 0 <= seed <= REPLAY_MAX_SEED:
+        raise argparse.ArgumentTypeError(f"the seed must be between 0 and {REPLAY_MAX_SEED}")
+    return seed
 
 # Main game loop
-def main():
-    game = MemoryGame()
-    clock = pygame.time.Clock()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory Match Game")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="update only the changed regions of the display each frame")
+    parser.add_argument("--grid", type=parse_grid, metavar="COLSxROWS",
+                        help="play a custom grid size, e.g. 6x100 for a large scrolling board")
+    parser.add_argument("--size", type=parse_window_size, default=(BASE_WIDTH, BASE_HEIGHT), metavar="WxH",
+                        help=f"initial window size (default: {BASE_WIDTH}x{BASE_HEIGHT}); the window can be resized")
+    parser.add_argument("--fullscreen", action="store_true", help="start fullscreen (F11 toggles)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print where launch time went once the first frame is shown")
+    parser.add_argument("--audio-report", action="store_true",
+                        help="print the mixer format, output latency and voice usage on exit")
+    parser.add_argument("--profile", action="store_true",
+                        help="collect per-phase frame timings (press F3 for the overlay)")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="write the frame timings to a .csv or .json file on exit")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS,
+                        help=f"render frame rate cap, e.g. 144 for high-refresh displays; 0 for uncapped "
+                             f"(the simulation always runs at {SIM_RATE} steps per second)")
+    parser.add_argument("--seed", type=parse_seed, help="seed every source of randomness")
+    parser.add_argument("--scores", metavar="PATH", default=DEFAULT_SCORES_PATH,
+                        help=f"high-score database (default: {DEFAULT_SCORES_PATH})")
+    parser.add_argument("--record", metavar="PATH", help="record this session's input to a replay log")
+    parser.add_argument("--replay", metavar="PATH", help="play back a recorded replay log")
+    parser.add_argument("--replay-speed", choices=("realtime", "max"), default="realtime",
+                        help="play the replay at its recorded pace or as fast as possible")
+    args = parser.parse_args(argv)
+    if args.grid and max(args.grid) > REPLAY_MAX_SIDE:
+        parser.error(f"argument --grid: grid sides are limited to {REPLAY_MAX_SIDE}")
     
-    while True:
-        game.handle_events()
-        game.update()
-        game.draw()
+    # A replay opens a window at the size its recording started at, so it lays out the same
+    replay = ReplayInput(args.replay) if args.replay else None
+    if replay:
+        init_display(replay.size)
+    else:
+        init_display(args.size, args.fullscreen)
+    dirty_rects.enabled = args.dirty_rects
+    if args.profile or args.profile_out:
+        profiler.enable()
         
-        pygame.display.flip()
-        clock.tick(60)
+    # Recordings and replays load synchronously so loading time cannot shift their frames
+    # Replayed games are not new results, so they are never scored
+    recorder = scores = None
+    if replay:
+        game = MemoryGame(custom_grid=replay.custom_grid, seed=replay.seed, input_source=replay)
+    else:
+        seed = args.seed if args.seed is not None else random.getrandbits(64)
+        try:
+            scores = ScoreStore(args.scores)
+        except sqlite3.Error as error:
+            # High scores are optional; a read-only directory or a locked database just disables them
+            print(f"High scores disabled: {args.scores}: {error}")
+        if args.record:
+            recorder = InputRecorder(seed, args.grid, (SCREEN_WIDTH, SCREEN_HEIGHT))
+            game = MemoryGame(custom_grid=args.grid, seed=seed, input_source=recorder, scores=scores)
+        else:
+            game = MemoryGame(custom_grid=args.grid, seed=seed, loader=AssetLoader(assets), scores=scores)
+    clock = pygame.time.Clock()
+    first_frame = True
+    report_pending = args.startup_report
+    dt_ms = 1000 // SIM_RATE
+    accumulator = 0.0
+    
+    try:
+        while game.running:
+            if replay:
+                if replay.finished:
+                    break
+                dt_ms = replay.next_frame()
+            with profiler.phase("frame"):
+                with profiler.phase("events"):
+                    game.handle_events()
+                with profiler.phase("update"):
+                    # Advance the simulation in fixed steps. A slow frame runs several
+                    # steps, skipping renders, instead of slowing the game down
+                    accumulator += dt_ms / 1000
+                    steps = 0
+                    while accumulator >= SIM_DT and steps < MAX_SIM_STEPS:
+                        game.update(SIM_DT)
+                        accumulator -= SIM_DT
+                        steps += 1
+                    if steps == MAX_SIM_STEPS:
+                        accumulator = min(accumulator, SIM_DT)  # Too far behind; drop the backlog
+                with profiler.phase("draw"):
+                    game.draw(accumulator / SIM_DT)
+                profiler.draw_overlay(screen)
+                
+                dirty_rects.present()
+            profiler.end_frame()
+            if first_frame:
+                first_frame = False
+                startup_timer.mark("first frame")
+            # Report once the menu is up, not at the loading screen; without a
+            # background loader that is the first frame
+            if report_pending and game.state != GameState.LOADING:
+                report_pending = False
+                print(startup_timer.report())
+            game.input.end_frame(dt_ms)
+            if replay and args.replay_speed == "max":
+                continue
+            # The measured frame time drives the game clock, so recordings replay exactly
+            measured_ms = clock.tick(args.fps)
+            if not replay:
+                dt_ms = measured_ms
+    finally:
+        if args.profile_out:
+            profiler.export(args.profile_out)
+        if args.audio_report:
+            print(sound_bank.report())
+        if scores:
+            scores.close()
+        if recorder:
+            recorder.save(args.record)
+            print(f"Recorded {recorder.frame_count} frames to {args.record}; final board {game.board.digest():08x}")
+        if replay:
+            print(f"Replay finished; final board {game.board.digest():08x}")
+        pygame.quit()
+
+startup_timer.mark("import")
 
 if __name__ == "__main__":
     main()
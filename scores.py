@@ -0,0 +1,109 @@
+# Persistent high scores for the Memory Match Game
+#
+# Finished games are kept in a local SQLite database indexed by difficulty
+# and grid size. Writes are queued to a background thread that owns its own
+# connection, so recording a result never waits on the disk. Best results
+# per grid are loaded once at open and kept current in memory, so the game
+# can show them without querying.
+import queue
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = "scores.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    difficulty TEXT NOT NULL,
+    columns INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    moves INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_time ON scores (difficulty, columns, rows, seconds);
+CREATE INDEX IF NOT EXISTS scores_by_moves ON scores (difficulty, columns, rows, moves);
+"""
+
+class ScoreStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        connection = self.connect()
+        connection.executescript(SCHEMA)
+        # (difficulty, columns, rows) -> [best seconds, fewest moves], read via the index
+        self.bests = {
+            (difficulty, columns, rows): [seconds, moves]
+            for difficulty, columns, rows, seconds, moves in connection.execute(
+                "SELECT difficulty, columns, rows, MIN(seconds), MIN(moves) FROM scores GROUP BY difficulty, columns, rows"
+            )
+        }
+        connection.close()
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name="scores", daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")  # Readers never wait on the writer
+        return connection
+
+    def write_loop(self):
+        connection = self.connect()
+        while True:
+            # Commit whatever queued up behind the first row in one transaction
+            rows = [self.pending.get()]
+            while rows[-1] is not None and not self.pending.empty():
+                rows.append(self.pending.get())
+            batch = [row for row in rows if row is not None]
+            if batch:
+                # A failed write loses this batch but never the writer, so flush() cannot hang
+                try:
+                    with connection:
+                        connection.executemany(
+                            "INSERT INTO scores (difficulty, columns, rows, moves, seconds, played_at) VALUES (?, ?, ?, ?, ?, ?)", batch
+                        )
+                except sqlite3.Error:
+                    pass
+            for _ in rows:
+                self.pending.task_done()
+            if rows[-1] is None:
+                break
+        connection.close()
+
+    def record(self, difficulty, grid, moves, seconds):
+        # Queue a finished game; returns True if it set a new best time
+        key = (difficulty, *grid)
+        best = self.bests.get(key)
+        new_best = best is None or seconds < best[0]
+        self.bests[key] = [min(seconds, best[0]), min(moves, best[1])] if best else [seconds, moves]
+        self.pending.put((difficulty, grid[0], grid[1], moves, seconds, time.time()))
+        return new_best
+
+    def best(self, difficulty, grid):
+        # (best seconds, fewest moves) for a grid, or None if it was never finished
+        best = self.bests.get((difficulty, *grid))
+        return tuple(best) if best else None
+
+    def top(self, difficulty, grid, count=10, by="seconds"):
+        # The best `count` results for a grid as (moves, seconds, played_at) rows.
+        # This reads the disk; call it off the frame loop.
+        order = {"seconds": "seconds, moves", "moves": "moves, seconds"}[by]
+        self.flush()
+        connection = self.connect()
+        try:
+            return connection.execute(
+                f"SELECT moves, seconds, played_at FROM scores WHERE difficulty = ? AND columns = ? AND rows = ? ORDER BY {order} LIMIT ?",
+                (difficulty, grid[0], grid[1], count),
+            ).fetchall()
+        finally:
+            connection.close()
+
+    def flush(self):
+        # Wait until every queued result is on disk
+        self.pending.join()
+
+    def close(self):
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
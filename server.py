@@ -0,0 +1,191 @@
+# Multi-session Memory Match server
+#
+# Hosts many independent boards from one asyncio event loop. Clients connect
+# over TCP and speak a compact line protocol; the server pushes state diffs
+# back as they happen rather than whole boards:
+#
+#   client -> server                 server -> client
+#   N <cols> <rows> [seed]  new game S <id> <cols> <rows>  session started
+#   F <index>               flip     U <index> <type>      card turned up
+#   Q                       quit     M <a> <b>             pair matched
+#                                    H <a> <b>             pair turned back down
+#                                    T <seconds>           timer, once a second
+#                                    W <moves> <seconds>   board cleared
+#                                    E <reason>            command rejected
+#
+#     python server.py --port 8765
+#     python loadgen.py --port 8765 --sessions 2000
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import deque
+from board import Board
+from stats import percentile
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CHECK_DELAY = 1.0  # Seconds a mismatched pair stays face up, as in the game
+STATS_INTERVAL = 5.0
+LATENCY_WINDOW = 100000  # Command timings kept for the percentiles
+MAX_CARDS = 10000
+
+class Session:
+    def __init__(self, session_id, writer, columns, rows, seed):
+        self.id = session_id
+        self.writer = writer
+        self.board = Board(columns, rows, rng=random.Random(seed))
+        self.clock = time.monotonic()
+        self.check = None  # Pending call that resolves the face-up pair
+
+    def sync(self, now):
+        # Bring the board's play time up to date
+        self.board.advance(now - self.clock)
+        self.clock = now
+
+    def send(self, line):
+        if not self.writer.is_closing():
+            self.writer.write(line.encode() + b"\n")
+
+class GameServer:
+    def __init__(self, check_delay=CHECK_DELAY):
+        self.check_delay = check_delay
+        self.sessions = {}  # Session id -> Session
+        self.next_id = 1
+        self.commands = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    async def handle(self, reader, writer):
+        session = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = time.perf_counter()
+                parts = line.split()
+                if not parts:
+                    continue
+                command = parts[0]
+                if command == b"F":
+                    if session is None:
+                        writer.write(b"E session\n")
+                    else:
+                        self.flip(session, parts)
+                elif command == b"N":
+                    self.close_session(session)
+                    session = self.new_session(writer, parts)
+                elif command == b"Q":
+                    break
+                else:
+                    writer.write(b"E command\n")
+                self.commands += 1
+                self.latencies.append(time.perf_counter() - start)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.close_session(session)
+            writer.close()
+
+    def new_session(self, writer, parts):
+        try:
+            columns, rows = int(parts[1]), int(parts[2])
+            seed = int(parts[3]) if len(parts) > 3 else None
+        except (IndexError, ValueError):
+            writer.write(b"E new\n")
+            return None
+        if columns < 1 or rows < 1 or not 2 <= columns * rows <= MAX_CARDS:
+            writer.write(b"E grid\n")
+            return None
+        session = Session(self.next_id, writer, columns, rows, seed)
+        self.next_id += 1
+        self.sessions[session.id] = session
+        session.send(f"S {session.id} {columns} {rows}")
+        return session
+
+    def close_session(self, session):
+        if session is not None and self.sessions.pop(session.id, None):
+            if session.check:
+                session.check.cancel()
+
+    def flip(self, session, parts):
+        try:
+            index = int(parts[1])
+        except (IndexError, ValueError):
+            index = -1
+        board = session.board
+        session.sync(time.monotonic())  # Play time is counted up to each action
+        if not board.flip(index):
+            session.send(f"E flip {index}")
+            return
+        session.send(f"U {index} {board.cards[index]}")
+        if board.is_checking:
+            session.check = asyncio.get_running_loop().call_later(self.check_delay, self.resolve, session)
+
+    def resolve(self, session):
+        session.check = None
+        # Sync before resolving: once the last pair matches the board stops its clock
+        session.sync(time.monotonic())
+        first, second, matched = session.board.resolve()
+        session.send(f"{'M' if matched else 'H'} {first} {second}")
+        if session.board.is_won:
+            session.send(f"W {session.board.moves} {session.board.elapsed_time:.3f}")
+
+    async def tick_timers(self):
+        # One pass a second pushes every unfinished board's timer
+        while True:
+            await asyncio.sleep(1.0)
+            now = time.monotonic()
+            for session in self.sessions.values():
+                if not session.board.is_won:
+                    session.sync(now)
+                    session.send(f"T {int(session.board.elapsed_time)}")
+
+    async def report_stats(self, interval):
+        # Sessions per core is how many sessions one fully busy core would host at this load
+        wall, cpu, commands = time.monotonic(), time.process_time(), self.commands
+        while True:
+            await asyncio.sleep(interval)
+            now_wall, now_cpu = time.monotonic(), time.process_time()
+            load = (now_cpu - cpu) / (now_wall - wall)
+            rate = (self.commands - commands) / (now_wall - wall)
+            line = f"sessions {len(self.sessions):6d}  commands/s {rate:9.0f}  cpu {load:6.1%}"
+            if self.latencies:
+                ordered = sorted(self.latencies)
+                line += f"  p50 {percentile(ordered, 50) * 1e6:6.1f} us  p99 {percentile(ordered, 99) * 1e6:6.1f} us"
+            if self.sessions and load > 0:
+                line += f"  sessions/core {len(self.sessions) / load:9.0f}"
+            print(line, flush=True)
+            wall, cpu, commands = now_wall, now_cpu, self.commands
+            self.latencies.clear()
+
+async def serve(host, port, check_delay, stats_interval):
+    game_server = GameServer(check_delay)
+    server = await asyncio.start_server(game_server.handle, host, port, backlog=4096)
+    print(f"Serving on {host}:{port} ({os.cpu_count()} cores available, one event loop)", flush=True)
+    tasks = [asyncio.create_task(game_server.tick_timers())]
+    if stats_interval:
+        tasks.append(asyncio.create_task(game_server.report_stats(stats_interval)))
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory Match multi-session server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--check-delay", type=float, default=CHECK_DELAY,
+                        help=f"seconds before a face-up pair is resolved (default: {CHECK_DELAY})")
+    parser.add_argument("--stats-interval", type=float, default=STATS_INTERVAL,
+                        help="seconds between load reports; 0 to disable")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.check_delay, args.stats_interval))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+# Monte Carlo solver for tuning grid sizes and par scores
+#
+# Plays shuffled games on the headless board engine with a model of the
+# player and reports how many moves a game takes on each grid size. Games
+# are split into chunks across a process pool:
+#
+#     python solver.py --games 1000000
+#     python solver.py --agent limited --recall 6 --grid 5x4 --grid 6x4
+#     python solver.py --agent all --json solver.json
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from board import Board, DIFFICULTY_GRIDS
+from cli import parse_grid, positive_int
+
+DEFAULT_GAMES = 100000
+DEFAULT_RECALL = 4
+CHUNK_GAMES = 5000  # Games per pool task; large enough to amortize the pickling
+
+# Agent models: name -> how many seen cards the player remembers
+# (None remembers everything, 0 remembers nothing and plays at random)
+AGENTS = {
+    "perfect": None,
+    "limited": DEFAULT_RECALL,
+    "random": 0,
+}
+
+# A player who remembers the positions of the last `recall` cards seen.
+# Known pairs are taken first; otherwise an unseen card is turned, followed
+# by its remembered partner if there is one.
+class Agent:
+    def __init__(self, rng, recall=None):
+        self.rng = rng
+        self.recall = recall
+        self.reset()
+
+    def reset(self):
+        self.seen = OrderedDict()  # Card index -> type, oldest first
+        self.planned = None
+
+    def observe(self, index, card_type):
+        if self.recall == 0:
+            return
+        self.seen[index] = card_type
+        self.seen.move_to_end(index)
+        if self.recall is not None and len(self.seen) > self.recall:
+            self.seen.popitem(last=False)
+
+    def forget(self, index):
+        self.seen.pop(index, None)
+
+    def partner(self, index, card_type):
+        for other, other_type in self.seen.items():
+            if other != index and other_type == card_type:
+                return other
+        return None
+
+    def unseen(self, board, exclude=None):
+        # A random face-down card not in memory, or any face-down card if all are known
+        matched = board.matched
+        candidates = [i for i in range(len(board.cards)) if not matched[i] and i != exclude and i not in self.seen]
+        if not candidates:
+            candidates = [i for i in range(len(board.cards)) if not matched[i] and i != exclude]
+        return self.rng.choice(candidates)
+
+    def first_pick(self, board):
+        for index, card_type in self.seen.items():
+            other = self.partner(index, card_type)
+            if other is not None:
+                self.planned = other
+                return index
+        return self.unseen(board)
+
+    def second_pick(self, board, first):
+        if self.planned is not None:
+            second, self.planned = self.planned, None
+            return second
+        other = self.partner(first, board.cards[first])
+        return other if other is not None else self.unseen(board, exclude=first)
+
+def play_game(board, agent):
+    # Play one freshly dealt board to the end; returns the number of moves
+    board.reset()
+    agent.reset()
+    while not board.is_won:
+        first = agent.first_pick(board)
+        board.flip(first)
+        agent.observe(first, board.cards[first])
+        second = agent.second_pick(board, first)
+        board.flip(second)
+        agent.observe(second, board.cards[second])
+        _, _, matched = board.resolve()
+        if matched:
+            agent.forget(first)
+            agent.forget(second)
+    return board.moves
+
+def simulate_chunk(grid, recall, games, seed):
+    # Pool task: play `games` games and return a histogram of moves taken
+    rng = random.Random(seed)
+    board = Board(*grid, rng=rng)
+    agent = Agent(rng, recall)
+    return Counter(play_game(board, agent) for _ in range(games))
+
+def simulate(grid, recall, games, seed, executor):
+    # Split the games into seeded chunks so results do not depend on the worker count
+    chunks = [min(CHUNK_GAMES, games - start) for start in range(0, games, CHUNK_GAMES)]
+    seeds = [f"{seed}:{grid}:{recall}:{i}" for i in range(len(chunks))]
+    histogram = Counter()
+    for counts in executor.map(simulate_chunk, [grid] * len(chunks), [recall] * len(chunks), chunks, seeds):
+        histogram.update(counts)
+    return histogram
+
+def percentile(histogram, point):
+    # Smallest move count covering `point` percent of games
+    target = sum(histogram.values()) * point / 100
+    total = 0
+    for moves in sorted(histogram):
+        total += histogram[moves]
+        if total >= target:
+            return moves
+    return max(histogram)
+
+def summarize(histogram):
+    games = sum(histogram.values())
+    mean = sum(moves * count for moves, count in histogram.items()) / games
+    variance = sum((moves - mean) ** 2 * count for moves, count in histogram.items()) / games
+    return {
+        "games": games,
+        "mean": mean,
+        "stdev": math.sqrt(variance),
+        "min": min(histogram),
+        "p10": percentile(histogram, 10),
+        "p50": percentile(histogram, 50),
+        "p90": percentile(histogram, 90),
+        "max": max(histogram),
+        # Par is the median game; beating it puts a player in the better half
+        "par": percentile(histogram, 50),
+        "histogram": {str(moves): histogram[moves] for moves in sorted(histogram)},
+    }
+
+def format_results(results):
+    lines = [f"{'agent':<8} {'grid':<6} {'pairs':>5} {'mean':>7} {'stdev':>6} {'min':>4} {'p10':>4} {'p50':>4} {'p90':>4} {'max':>5} {'par':>4}"]
+    for agent, grids in results.items():
+        for grid, result in grids.items():
+            columns, rows = map(int, grid.split("x"))
+            lines.append(
+                f"{agent:<8} {grid:<6} {columns * rows // 2:5d} {result['mean']:7.2f} {result['stdev']:6.2f} "
+                f"{result['min']:4d} {result['p10']:4d} {result['p50']:4d} {result['p90']:4d} {result['max']:5d} {result['par']:4d}"
+            )
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory Match Game Monte Carlo solver")
+    parser.add_argument("--games", type=positive_int, default=DEFAULT_GAMES, help="games per agent and grid size")
+    parser.add_argument("--agent", choices=[*AGENTS, "all"], default="limited", help="player model (default: limited)")
+    parser.add_argument("--recall", type=int, default=DEFAULT_RECALL,
+                        help=f"cards remembered by the limited agent (default: {DEFAULT_RECALL})")
+    parser.add_argument("--grid", type=parse_grid, action="append", metavar="COLSxROWS",
+                        help="grid size to simulate, repeatable (default: the difficulty grids)")
+    parser.add_argument("--workers", type=positive_int, default=os.cpu_count(), help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="write the results, with full histograms, to a JSON file")
+    args = parser.parse_args(argv)
+
+    agents = dict(AGENTS, limited=args.recall)
+    if args.agent != "all":
+        agents = {args.agent: agents[args.agent]}
+    grids = args.grid or list(DIFFICULTY_GRIDS.values())
+
+    start = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for name, recall in agents.items():
+            results[name] = {
+                f"{columns}x{rows}": summarize(simulate((columns, rows), recall, args.games, args.seed, executor))
+                for columns, rows in grids
+            }
+    elapsed = time.perf_counter() - start
+    print(format_results(results))
+    total_games = args.games * len(agents) * len(grids)
+    print(f"\n{total_games} games in {elapsed:.1f} s ({total_games / elapsed:,.0f} games/s on {args.workers} workers)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+# Shared statistics helpers for the Memory Match tools
+#
+# Used by the game's frame profiler, the benchmark suite, the server's load
+# reports and the load generator, so they all quote percentiles the same way.
+
+def percentile(sorted_values, point):
+    # Nearest-rank percentile of an ascending list; `point` is 0-100
+    return sorted_values[min(len(sorted_values) - 1, len(sorted_values) * point // 100)]